@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# SPDX-FileCopyrightText: 2023 Blender Foundation
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+"""
+Benchmark & validate ``PathPatternMatch`` from ``blender_ext.py``.
+
+Each set of patterns is tested against a generated tree of paths, comparing the literal index & combined REGEX
+(used by ``PathPatternMatch.test_path``) with testing each REGEX in order (``PathPatternMatch._test_path_regex_list``).
+Randomized patterns (anchored, directory & negated) are then tested against randomized paths in the same way.
+Exits with an error when the results differ.
+
+Usage: ``python benchmark_path_pattern_match.py [NUMBER_OF_PATHS]``
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from blender_ext import PathPatternMatch  # noqa: E402
+
+
+PATHS_NUM_DEFAULT = 120_000
+
+# The number of randomized pattern lists & the number of paths each is tested against.
+RANDOM_PATTERNS_NUM = 3000
+RANDOM_PATHS_NUM = 50
+
+PATTERNS_ALL: tuple[tuple[str, list[str]], ...] = (
+    ("default", ["__pycache__/", "/.git/", "/*.zip"]),
+    ("typical", [
+        "__pycache__/", "/.git/", "/*.zip", ".*", "*.pyc", "*.blend1", "docs/build/", "/tests/", "!keep.pyc",
+    ]),
+    ("many", (
+        ["__pycache__/", "/.git/", "/*.zip"] +
+        ["*.ext{:d}".format(i) for i in range(50)] +
+        ["/dir{:d}/".format(i) for i in range(50)]
+    )),
+    ("wildcard", ["**/build/**", "*.py[co]", "data?/"]),
+)
+
+# Names used for generated directories & files.
+DIRNAMES = (
+    "src", "lib", "data", "data1", "__pycache__", ".git", "assets", "mod", "tests", "docs", "build", "dir1", "dir7",
+)
+FILENAMES = (
+    "__init__.py", "f.py", "f.pyc", "keep.pyc", "image.png", "notes.txt", "scene.blend", "scene.blend1",
+    "archive.zip", ".hidden", "x.ext3", "x.ext49",
+)
+
+# Names & pattern components used for randomized paths & patterns.
+RANDOM_NAMES = ("a", "b", "ab", "a.py", "b.pyc", ".git", "x.txt", "__pycache__", "c.py", "py", "d", "a b", "a.b.c")
+RANDOM_PATTERN_ELEMS = RANDOM_NAMES + (
+    ".*", "__*", "*.b", "*c", "*", "*.py", "*.pyc", "**", "?", "a*", "*b", "[ab]", "[!a]*", "*.txt", "*a*", "\\!a",
+)
+
+
+def paths_generate(paths_num: int) -> list[str]:
+    rng = random.Random(0)
+    paths: list[str] = []
+
+    def paths_generate_recursive(prefix: str, depth: int) -> None:
+        if depth < 5:
+            for dirname in rng.sample(DIRNAMES, rng.randint(0, 3)):
+                paths.append(prefix + dirname + "/")
+                paths_generate_recursive(prefix + dirname + "/", depth + 1)
+        for filename in rng.sample(FILENAMES, rng.randint(1, 6)):
+            paths.append(prefix + filename)
+
+    # Include all files & directories at the root, so patterns starting with a slash are tested.
+    for dirname in DIRNAMES:
+        paths.append(dirname + "/")
+        paths_generate_recursive(dirname + "/", 1)
+    paths.extend(FILENAMES)
+    while len(paths) < paths_num:
+        prefix = "pkg{:d}/".format(len(paths))
+        paths.append(prefix)
+        paths_generate_recursive(prefix, 1)
+    return paths
+
+
+def random_pattern(rng: random.Random) -> str:
+    while True:
+        pattern = "/".join(rng.choice(RANDOM_PATTERN_ELEMS) for _ in range(rng.choice((1, 1, 1, 2, 3))))
+        # A pattern only containing `**` isn't supported.
+        if set(pattern.split("/")) != {"**"}:
+            break
+    if rng.random() < 0.3:
+        pattern = "/" + pattern
+    if rng.random() < 0.3:
+        pattern = pattern + "/"
+    if rng.random() < 0.2:
+        pattern = "!" + pattern
+    return pattern
+
+
+def random_path(rng: random.Random) -> str:
+    path = "/".join(rng.choice(RANDOM_NAMES) for _ in range(rng.randint(1, 5)))
+    if rng.random() < 0.4:
+        path = path + "/"
+    return path
+
+
+def main() -> int:
+    paths_num = int(sys.argv[1]) if len(sys.argv) > 1 else PATHS_NUM_DEFAULT
+    paths = paths_generate(paths_num)
+
+    has_error = False
+    for name, path_patterns in PATTERNS_ALL:
+        matcher = PathPatternMatch(path_patterns)
+
+        time_start = time.perf_counter()
+        result_regex = [matcher._test_path_regex_list(path) for path in paths]
+        time_regex = time.perf_counter() - time_start
+
+        time_start = time.perf_counter()
+        result_indexed = [matcher.test_path(path) for path in paths]
+        time_indexed = time.perf_counter() - time_start
+
+        if result_regex != result_indexed:
+            sys.stderr.write("Error: {:s}: results differ for {:d} paths\n".format(
+                name,
+                sum(1 for a, b in zip(result_regex, result_indexed) if a != b),
+            ))
+            has_error = True
+
+        print("{:10s} {:d} paths ({:d} matched): regex {:.3f}s, indexed {:.3f}s ({:.1f}x)".format(
+            name, len(paths), sum(result_regex), time_regex, time_indexed, time_regex / time_indexed,
+        ))
+
+    rng = random.Random(0)
+    tests_num = 0
+    mismatch_num = 0
+    for _ in range(RANDOM_PATTERNS_NUM):
+        path_patterns = [random_pattern(rng) for _ in range(rng.randint(1, 6))]
+        matcher = PathPatternMatch(path_patterns)
+        for _ in range(RANDOM_PATHS_NUM):
+            path = random_path(rng)
+            tests_num += 1
+            if (result := matcher.test_path(path)) == matcher._test_path_regex_list(path):
+                continue
+            if mismatch_num < 10:
+                sys.stderr.write("Error: patterns {!r} path {!r}: expected {!r}\n".format(
+                    path_patterns, path, not result,
+                ))
+            mismatch_num += 1
+
+    print("randomized {:d} paths: {:d} differ".format(tests_num, mismatch_num))
+    if mismatch_num:
+        has_error = True
+
+    return 1 if has_error else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
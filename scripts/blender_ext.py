@@ -11,18 +11,24 @@ Command for managing Blender extensions.
 import argparse
 import contextlib
 import hashlib  # for SHA1 check-summing files.
+import http.client  # For persistent (keep-alive) connections.
 import io
 import json
 import os
 import re
 import shutil
 import signal  # Override `Ctrl-C`.
+import socket  # For `TransferMonitor` to set the time-out of reads.
+import stat  # For normalizing permissions in reproducible builds.
 import sys
+import threading
+import time
 import tomllib
 import urllib.error  # For `URLError`.
 import urllib.parse  # For `urljoin`.
 import urllib.request  # For accessing remote `https://` paths.
 import zipfile
+import zlib  # For `crc32` when verifying installed files.
 
 
 from typing import (
@@ -61,6 +67,23 @@ VERSION = "0.1"
 PKG_EXT = ".zip"
 # PKG_JSON_INFO = "index.json"
 
+# Partially downloaded archives in the cache, see: `pkg_archive_partial_filepath`.
+PKG_EXT_PARTIAL = ".part"
+
+# Stores the hash of a file along with its `stat` signature, see: `sha256_from_file_with_sidecar_or_error`.
+SHA256_SIDECAR_EXT = ".sha256"
+
+# A record of the files written when installing a package, stored in the package directory.
+PKG_RECORD_FILENAME = ".blender_ext_record.json"
+
+# Stored next to archives created by an incremental build, see: `BuildCacheIncremental`.
+BUILD_CACHE_EXT = ".build_cache.json"
+
+# The fixed size part of a ZIP local file header & its signature (from the ZIP specification),
+# used when copying compressed data between archives, see: `zipfile_write_raw_from_zipfile`.
+ZIP_LOCAL_FILE_HEADER_SIZE = 30
+ZIP_LOCAL_FILE_HEADER_SIGNATURE = b"PK\x03\x04"
+
 PKG_REPO_LIST_FILENAME = "index.json"
 
 # Only for building.
@@ -131,11 +154,26 @@ RE_PYTHON_WHEEL_VERSION_TAG = re.compile("([a-zA-Z]+)([0-9]+)")
 # Small values add unnecessary overhead showing progress, large values will make
 # progress not update often enough.
 #
-# Note that this could be dynamic although it's not a priority.
+# This is the initial size, see: `CHUNK_SIZE_MAX` & `CHUNK_READ_TIME_TARGET`.
 #
 # 16kb to be responsive even on slow connections.
 CHUNK_SIZE_DEFAULT = 1 << 14
 
+# The chunk size grows while reading a chunk takes less than `CHUNK_READ_TIME_TARGET` (in seconds)
+# so fast transfers don't spend their time iterating over small chunks.
+CHUNK_SIZE_MAX = 1 << 20
+CHUNK_READ_TIME_TARGET = 0.05
+
+# The total size of files compressed in memory at once when building with multiple jobs.
+# Larger files are compressed while they are written (without using other threads).
+BUILD_DEFLATE_JOBS_SIZE_MAX = CHUNK_SIZE_MAX * 256
+
+# While downloading in the background, progress is reported at this interval (in seconds).
+DOWNLOAD_PROGRESS_INTERVAL = 0.1
+
+# Archives with fewer files are extracted in a single thread, as threads add overhead.
+EXTRACT_PARALLEL_MEMBERS_MIN = 32
+
 # Short descriptions for the UI:
 # Used for project tag-line & permissions values.
 TERSE_DESCRIPTION_MAX_LENGTH = 64
@@ -271,10 +309,72 @@ def size_as_fmt_string(num: float, *, precision: int = 1) -> str:
     return "{:.{:d}f}{:s}".format(num, precision, unit)
 
 
-def read_with_timeout(fh: IO[bytes], size: int, *, timeout_in_seconds: float) -> bytes | None:
-    # TODO: implement timeout (TimeoutError).
-    _ = timeout_in_seconds
-    return fh.read(size)
+def readinto_iter(
+        fh: io.BufferedIOBase,
+        *,
+        chunk_size: int,
+        timeout_in_seconds: float,
+        transfer_monitor: "TransferMonitor",
+) -> Iterator[memoryview]:
+    """
+    Iterate over data read from ``fh`` into a buffer which is reused between reads.
+    The chunk size starts at ``chunk_size`` and adapts to the time taken by each read, up to ``CHUNK_SIZE_MAX``.
+
+    A ``TimeoutError`` is raised when a read takes longer than ``timeout_in_seconds``,
+    for sockets the time-out must also be set on the socket so a blocking read is interrupted
+    (the ``transfer_monitor`` reduces the time-out so a blocking read is also interrupted by its limits).
+    ``readinto1`` is used so a slow stream can't extend a single read beyond the time-out
+    (waiting to fill the whole buffer).
+
+    NOTE: each block is only valid until the next iteration.
+    """
+    buf = memoryview(bytearray(chunk_size))
+    while True:
+        transfer_monitor.read_begin()
+        time_start = time.monotonic()
+        try:
+            size = fh.readinto1(buf)
+        except TimeoutError:
+            # Report the limit which was exceeded when the time-out was reduced to enforce it.
+            transfer_monitor.update(0)
+            raise
+        time_elapsed = time.monotonic() - time_start
+        if not size:
+            break
+        if timeout_in_seconds > 0.0 and time_elapsed > timeout_in_seconds:
+            raise TimeoutError("read took {:.2f} seconds, exceeding the time-out of {:g}".format(
+                time_elapsed,
+                timeout_in_seconds,
+            ))
+        transfer_monitor.update(size)
+        yield buf[:size]
+
+        # Only a full buffer is a useful measure of throughput.
+        if size == len(buf):
+            if time_elapsed < CHUNK_READ_TIME_TARGET:
+                if len(buf) < CHUNK_SIZE_MAX:
+                    buf = memoryview(bytearray(min(len(buf) * 2, CHUNK_SIZE_MAX)))
+            elif time_elapsed > CHUNK_READ_TIME_TARGET * 4.0:
+                if len(buf) > chunk_size:
+                    buf = memoryview(bytearray(max(len(buf) // 2, chunk_size)))
+
+
+def file_preallocate(fh: io.BufferedIOBase, size: int) -> None:
+    """
+    Reserve ``size`` bytes for ``fh`` when the platform supports it,
+    reducing fragmentation and failing early when there isn't enough space.
+
+    NOTE: the file is extended to ``size``, callers must truncate it when less data is written.
+    """
+    if not hasattr(os, "posix_fallocate"):
+        return
+    try:
+        os.posix_fallocate(fh.fileno(), 0, size)
+    except OSError as ex:
+        import errno
+        if ex.errno == errno.ENOSPC:
+            raise
+        # Not supported by this file-system, not an error.
 
 
 class CleanupPathsContext:
@@ -321,6 +421,8 @@ class PkgManifest_Build(NamedTuple):
     """Package Build Information (for the "build" sub-command)."""
     paths: list[str] | None
     paths_exclude_pattern: list[str] | None
+    # Path patterns & their compression method, see: `BuildCompressPolicy`.
+    compress: list[tuple[str, str]] | None = None
 
     @staticmethod
     def _from_dict_impl(
@@ -358,12 +460,31 @@ class PkgManifest_Build(NamedTuple):
         if (paths is not None) and (paths_exclude_pattern is not None):
             error_list.append("[build]: declaring both \"paths\" and \"paths_exclude_pattern\" is not supported")
 
+        if value := manifest_build_dict.get("compress"):
+            if not isinstance(value, dict):
+                error_list.append("[build]: \"compress\" must be a table, not a {!r}".format(type(value)))
+            else:
+                for pattern, method in value.items():
+                    if not isinstance(method, str):
+                        error_list.append("[build.compress]: \"{:s}\" must be a string, not a {!r}".format(
+                            pattern,
+                            type(method),
+                        ))
+                    elif isinstance(result := build_compress_method_parse_or_error(method), str):
+                        error_list.append("[build.compress]: \"{:s}\" {:s}".format(pattern, result))
+            if not all_errors:
+                return error_list
+            compress = list(value.items())
+        else:
+            compress = None
+
         if error_list:
             return error_list
 
         return PkgManifest_Build(
             paths=paths,
             paths_exclude_pattern=paths_exclude_pattern,
+            compress=compress,
         )
 
     @staticmethod
@@ -504,39 +625,172 @@ def sha256_from_file_or_error(
         return size, ("sha256:" + sha256.hexdigest()) if hash_prefix else sha256.hexdigest()
 
 
+def sha256_sidecar_write(filepath: str, sha256: str) -> None:
+    """
+    Store the hash of ``filepath`` with its ``stat`` signature so it doesn't need to be recalculated
+    while the file is unchanged. Failure to write is ignored (the hash is recalculated).
+    """
+    filepath_sidecar = filepath + SHA256_SIDECAR_EXT
+    try:
+        st = os.stat(filepath)
+        with open(filepath_sidecar, "w", encoding="utf-8") as fh:
+            json.dump({"size": st.st_size, "mtime_ns": st.st_mtime_ns, "inode": st.st_ino, "sha256": sha256}, fh)
+    except Exception:
+        pass
+
+
+def sha256_from_file_with_sidecar_or_error(filepath: str) -> tuple[int, str] | str:
+    """
+    Return the size & hash (with a ``sha256:`` prefix) of ``filepath``.
+    The hash is read from the sidecar when the file's size, modification time & inode match,
+    otherwise it's calculated & the sidecar is updated.
+    """
+    filepath_sidecar = filepath + SHA256_SIDECAR_EXT
+    try:
+        st = os.stat(filepath)
+    except Exception as ex:
+        return "error opening file: {:s}".format(str(ex))
+
+    try:
+        with open(filepath_sidecar, "r", encoding="utf-8") as fh:
+            sidecar = json.load(fh)
+        if (
+                sidecar["size"] == st.st_size and
+                sidecar["mtime_ns"] == st.st_mtime_ns and
+                sidecar["inode"] == st.st_ino and
+                isinstance(sha256 := sidecar["sha256"], str)
+        ):
+            return st.st_size, sha256
+    except Exception:
+        # Missing or invalid, calculate the hash.
+        pass
+
+    if isinstance((result := sha256_from_file_or_error(filepath, hash_prefix=True)), str):
+        return result
+    sha256_sidecar_write(filepath, result[1])
+    return result
+
+
+def pkg_archive_partial_filepath(filepath_archive: str, archive_size: int, archive_hash: str) -> str:
+    """
+    Return the path used to store a partial download of ``filepath_archive``.
+    The expected size & hash are included so data from a different archive is never resumed.
+    """
+    return "{:s}@{:s}-{:d}{:s}".format(
+        filepath_archive,
+        archive_hash.removeprefix("sha256:"),
+        archive_size,
+        PKG_EXT_PARTIAL,
+    )
+
+
+def pkg_archive_partial_filepaths_remove(filepath_archive: str, *, keep: str = "") -> None:
+    """
+    Remove partial downloads of ``filepath_archive`` (any size & hash), except for ``keep``.
+    """
+    dirpath, filename = os.path.split(filepath_archive)
+    prefix = filename + "@"
+    try:
+        entries = list(os.scandir(dirpath))
+    except OSError:
+        return
+    for entry in entries:
+        if not (entry.name.startswith(prefix) and entry.name.endswith(PKG_EXT_PARTIAL)):
+            continue
+        if entry.path == keep:
+            continue
+        try:
+            os.unlink(entry.path)
+        except OSError:
+            pass
+
+
 def scandir_recursive_impl(
-        base_path: str,
         path: str,
+        path_relative: str,
         *,
         filter_fn: Callable[[str, bool], bool],
 ) -> Iterator[tuple[str, str]]:
-    """Recursively yield DirEntry objects for given directory."""
-    for entry in os.scandir(path):
-        if entry.is_symlink():
-            continue
+    """
+    Recursively yield files (their path & relative path) for given directory, depth first.
+    Where ``path_relative`` is the relative path of ``path`` (empty for the base directory).
+    """
+    # Use a stack instead of recursion, extending the relative path of each directory
+    # (instead of calling `os.path.relpath` for every entry).
+    stack = [(os.scandir(path), (path_relative + os.sep) if path_relative else "")]
+    try:
+        while stack:
+            scandir_it, prefix = stack[-1]
+            for entry in scandir_it:
+                # NOTE: these checks use the type from the directory listing (typically without a `stat` call).
+                if entry.is_symlink():
+                    continue
 
-        entry_path = entry.path
-        entry_path_relateive = os.path.relpath(entry_path, base_path)
+                entry_path_relative = prefix + entry.name
 
-        is_dir = entry.is_dir()
-        if not filter_fn(entry_path_relateive, is_dir):
-            continue
+                is_dir = entry.is_dir()
+                if not filter_fn(entry_path_relative, is_dir):
+                    continue
 
-        if is_dir:
-            yield from scandir_recursive_impl(
-                base_path,
-                entry_path,
-                filter_fn=filter_fn,
-            )
-        elif entry.is_file():
-            yield entry_path, entry_path_relateive
+                if is_dir:
+                    # Scan the directory before the remaining entries.
+                    stack.append((os.scandir(entry.path), entry_path_relative + os.sep))
+                    break
+                if entry.is_file():
+                    yield entry.path, entry_path_relative
+            else:
+                stack.pop()
+                scandir_it.close()
+    finally:
+        for scandir_it, _ in stack:
+            scandir_it.close()
 
 
 def scandir_recursive(
         path: str,
         filter_fn: Callable[[str, bool], bool],
+        *,
+        jobs: int = 1,
 ) -> Iterator[tuple[str, str]]:
-    yield from scandir_recursive_impl(path, path, filter_fn=filter_fn)
+    """
+    Recursively yield files (their path & path relative to ``path``), depth first.
+    When ``jobs`` is greater than one, sub-directories of ``path`` are scanned in parallel,
+    ``filter_fn`` must be thread safe in this case.
+    """
+    if jobs <= 1:
+        yield from scandir_recursive_impl(path, "", filter_fn=filter_fn)
+        return
+
+    import concurrent.futures
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        # Files or the files from a sub-directory, in the order they would be scanned.
+        items: list[tuple[str, str] | concurrent.futures.Future[list[tuple[str, str]]]] = []
+        try:
+            with os.scandir(path) as scandir_it:
+                for entry in scandir_it:
+                    if entry.is_symlink():
+                        continue
+                    is_dir = entry.is_dir()
+                    if not filter_fn(entry.name, is_dir):
+                        continue
+                    if is_dir:
+                        items.append(executor.submit(
+                            list,
+                            scandir_recursive_impl(entry.path, entry.name, filter_fn=filter_fn),
+                        ))
+                    elif entry.is_file():
+                        items.append((entry.path, entry.name))
+
+            for item in items:
+                if isinstance(item, tuple):
+                    yield item
+                else:
+                    yield from item.result()
+        finally:
+            for item in items:
+                if not isinstance(item, tuple):
+                    item.cancel()
 
 
 def rmtree_with_fallback_or_error(
@@ -601,12 +855,73 @@ def rmtree_with_fallback_or_error(
     return None
 
 
+class RemovalReaper:
+    """
+    Remove directories (renamed by ``rmtree_with_fallback_or_error_pseudo_atomic``).
+    When ``defer`` is true, renamed directories are left in place for the "gc" command to remove,
+    so the time taken to replace or remove a package doesn't depend on its size.
+    When ``jobs`` is greater than one, the top-level entries of each directory are removed in parallel.
+    """
+    __slots__ = (
+        "_defer",
+        "_executor",
+    )
+
+    def __init__(self, *, defer: bool, jobs: int = 1) -> None:
+        import concurrent.futures
+        self._defer = defer
+        self._executor: concurrent.futures.ThreadPoolExecutor | None = None
+
+        if jobs > 1 and not defer:
+            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=jobs)
+
+    def rmtree_or_error(self, path: str, *, remove_file: bool, remove_link: bool) -> str | None:
+        # NOTE: this may be called from multiple threads.
+        if self._defer:
+            return None
+
+        if self._executor is not None and (not os.path.islink(path)) and os.path.isdir(path):
+            def remove_entry_or_error(entry: os.DirEntry[str]) -> str | None:
+                if entry.is_dir(follow_symlinks=False):
+                    return rmtree_with_fallback_or_error(entry.path)
+                try:
+                    os.unlink(entry.path)
+                except Exception as ex:
+                    return str(ex)
+                return None
+
+            try:
+                with os.scandir(path) as it:
+                    entries = list(it)
+            except Exception as ex:
+                return str(ex)
+
+            # Errors are reported by the removal of `path` which includes any entries that remain.
+            for future in [self._executor.submit(remove_entry_or_error, entry) for entry in entries]:
+                future.result()
+
+        return rmtree_with_fallback_or_error(
+            path,
+            remove_file=remove_file,
+            remove_link=remove_link,
+        )
+
+    def __enter__(self) -> "RemovalReaper":
+        return self
+
+    def __exit__(self, _ty: Any, _value: Any, _traceback: Any) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
 def rmtree_with_fallback_or_error_pseudo_atomic(
         path: str,
         *,
         temp_prefix_and_suffix: tuple[str, str],
         remove_file: bool = True,
         remove_link: bool = True,
+        reaper: RemovalReaper | None = None,
 ) -> str | None:
 
     # It's possible the directory doesn't exist, only attempt a rename if it does.
@@ -661,6 +976,14 @@ def rmtree_with_fallback_or_error_pseudo_atomic(
 
         path = path_test
 
+        # Once renamed, removal can be deferred as the original path is available.
+        if reaper is not None:
+            return reaper.rmtree_or_error(
+                path,
+                remove_file=remove_file,
+                remove_link=remove_link,
+            )
+
     return rmtree_with_fallback_or_error(
         path,
         remove_file=remove_file,
@@ -701,6 +1024,127 @@ def build_paths_expand_iter(
         )
 
 
+# Magic numbers of formats which are already compressed.
+BUILD_COMPRESS_MAGIC_STORE = (
+    # Images: PNG, JPEG, GIF, WEBP (checked separately), OpenEXR, JPEG-2000.
+    b"\x89PNG\r\n\x1a\n",
+    b"\xff\xd8\xff",
+    b"GIF87a",
+    b"GIF89a",
+    b"\x76\x2f\x31\x01",
+    b"\x00\x00\x00\x0cjP  ",
+    # Archives: ZIP (including wheels), GZIP (compressed `.blend` before 3.0), BZIP2, XZ, 7Z, RAR,
+    # ZSTD (compressed `.blend` 3.0 and newer).
+    b"PK\x03\x04",
+    b"\x1f\x8b",
+    b"BZh",
+    b"\xfd7zXZ\x00",
+    b"7z\xbc\xaf\x27\x1c",
+    b"Rar!\x1a\x07",
+    b"\x28\xb5\x2f\xfd",
+    # Audio: OGG, FLAC, MP3.
+    b"OggS",
+    b"fLaC",
+    b"ID3",
+)
+
+# Files with a higher entropy (in bits per byte) are stored.
+BUILD_COMPRESS_ENTROPY_STORE = 7.5
+# The number of bytes to sample when calculating entropy.
+BUILD_COMPRESS_SAMPLE_SIZE = 1 << 16
+
+
+def build_compress_method_parse_or_error(method: str) -> tuple[int, int] | str:
+    """
+    Return the compression type & level for a ``[build.compress]`` method,
+    ``-1`` is used for the level of the ``"auto"`` method.
+    """
+    if method == "store":
+        return zipfile.ZIP_STORED, 0
+    if method == "auto":
+        return zipfile.ZIP_DEFLATED, -1
+    if method == "deflate":
+        return zipfile.ZIP_DEFLATED, 9
+    if method.startswith("deflate-") and method[8:] in {str(i) for i in range(10)}:
+        return zipfile.ZIP_DEFLATED, int(method[8:])
+    return "expected \"store\", \"deflate\", \"deflate-0\"..\"deflate-9\" or \"auto\", found \"{:s}\"".format(method)
+
+
+def filepath_sniff_is_compressed(filepath: str) -> bool:
+    """
+    Return true when ``filepath`` is likely to be compressed already
+    (based on its magic number or the entropy of the first bytes).
+    """
+    import math
+    with open(filepath, "rb") as fh:
+        data = fh.read(BUILD_COMPRESS_SAMPLE_SIZE)
+    if data.startswith(BUILD_COMPRESS_MAGIC_STORE):
+        return True
+    # WEBP, other formats using RIFF (such as WAV) may be uncompressed.
+    if data.startswith(b"RIFF") and data[8:12] == b"WEBP":
+        return True
+    # MP4/MOV/AVIF/HEIF.
+    if data[4:8] == b"ftyp":
+        return True
+
+    # Small files are cheap to compress and don't provide a useful sample.
+    if len(data) < 4096:
+        return False
+
+    data_len = len(data)
+    entropy = 0.0
+    for i in range(256):
+        if count := data.count(i):
+            p = count / data_len
+            entropy -= p * math.log2(p)
+    return entropy > BUILD_COMPRESS_ENTROPY_STORE
+
+
+class BuildCompressPolicy:
+    """
+    Select the compression type & level for each file of a package.
+
+    The first matching pattern from ``[build.compress]`` is used,
+    other files are deflated unless they use a known compressed file extension.
+    """
+    __slots__ = (
+        "_rules",
+    )
+
+    def __init__(self, compress: list[tuple[str, str]] | None) -> None:
+        self._rules: list[tuple[PathPatternMatch, int, int]] = []
+        for pattern, method in (compress or ()):
+            result = build_compress_method_parse_or_error(method)
+            # Validated when loading the manifest.
+            assert isinstance(result, tuple)
+            self._rules.append((PathPatternMatch([pattern]), *result))
+
+    def from_filepath(self, filepath_abs: str, filepath_rel: str) -> tuple[int, int]:
+        """
+        Return the compression type & level for a file.
+        """
+        # Patterns always use forward slashes.
+        if os.sep == "\\":
+            filepath_rel = filepath_rel.replace("\\", "/")
+        for pattern_match, compress_type, compresslevel in self._rules:
+            if not pattern_match.test_path(filepath_rel):
+                continue
+            if compresslevel == -1:
+                try:
+                    is_compressed = filepath_sniff_is_compressed(filepath_abs)
+                except OSError:
+                    # Reported when the file is added to the archive.
+                    is_compressed = False
+                if is_compressed:
+                    return zipfile.ZIP_STORED, 0
+                return zipfile.ZIP_DEFLATED, 9
+            return compress_type, compresslevel
+
+        if filepath_skip_compress(filepath_abs):
+            return zipfile.ZIP_STORED, 0
+        return zipfile.ZIP_DEFLATED, 9
+
+
 def filepath_skip_compress(filepath: str) -> bool:
     """
     Return true when this file shouldn't be compressed while archiving.
@@ -1081,9 +1525,255 @@ def zipfile_make_root_directory(
         filelist.append(member)
 
 
+def zipfile_member_path_is_simple(filename: str) -> bool:
+    """
+    Return true when a members ``filename`` can be used as a relative path without any sanitizing.
+    """
+    if ("\\" in filename) or (":" in filename):
+        return False
+    return all(part not in {"", ".", ".."} for part in filename.split("/"))
+
+
+def zipfile_extract_members_parallel(
+        zip_fh: zipfile.ZipFile,
+        members: Sequence[zipfile.ZipInfo],
+        filepath_archive: str,
+        path: str,
+        *,
+        jobs: int,
+) -> None:
+    """
+    Extract ``members`` of ``zip_fh`` into ``path`` using up to ``jobs`` threads,
+    each thread reads from its own handle of ``filepath_archive`` (``zlib`` releases the GIL while inflating).
+
+    - Members are taken from ``zip_fh``, so changes made by ``zipfile_make_root_directory`` are respected.
+    - Directories are created first so threads never race to create them.
+    - The first exception is raised in the calling thread.
+    """
+    import concurrent.futures
+
+    members_file = []
+    dirnames = set()
+    for member in members:
+        if member.is_dir():
+            dirnames.add(member.filename.rstrip("/"))
+        else:
+            members_file.append(member)
+        dirname = member.filename.rstrip("/")
+        while (dirname := dirname.rpartition("/")[0]):
+            dirnames.add(dirname)
+
+    # Let `ZipFile` create the directories so paths are sanitized in the same way as files.
+    for dirname in sorted(dirnames):
+        zip_fh.extract(zipfile.ZipInfo(dirname + "/"), path)
+
+    # Balance the data each thread extracts, largest members first.
+    members_per_job: list[list[zipfile.ZipInfo]] = [[] for _ in range(min(jobs, len(members_file)))]
+    if not members_per_job:
+        return
+    members_per_job_size = [0] * len(members_per_job)
+    for member in sorted(members_file, key=lambda member: member.compress_size, reverse=True):
+        i = members_per_job_size.index(min(members_per_job_size))
+        members_per_job[i].append(member)
+        members_per_job_size[i] += member.compress_size + 1
+
+    cancel_event = threading.Event()
+
+    def extract_members(members: list[zipfile.ZipInfo]) -> None:
+        with zipfile.ZipFile(filepath_archive, mode="r") as zip_fh_job:
+            for member in members:
+                if cancel_event.is_set():
+                    return
+                zip_fh_job.extract(member, path)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(members_per_job)) as executor:
+        futures = [executor.submit(extract_members, members) for members in members_per_job]
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                future.result()
+        finally:
+            cancel_event.set()
+
+
 # -----------------------------------------------------------------------------
 # Path Matching
 
+class _PathPatternNameSet:
+    """
+    Literal names, ``name*`` prefixes & ``*name`` suffixes, matching a single path component.
+    """
+    __slots__ = (
+        "names",
+        "prefixes",
+        "suffixes",
+    )
+
+    def __init__(self) -> None:
+        self.names: set[str] = set()
+        self.prefixes: tuple[str, ...] = ()
+        self.suffixes: tuple[str, ...] = ()
+
+    def add_or_reject(self, elem: str) -> bool:
+        if (star_count := elem.count("*")) == 0:
+            self.names.add(elem)
+        elif star_count > 1:
+            return False
+        elif elem.startswith("*"):
+            self.suffixes = (*self.suffixes, elem[1:])
+        elif elem.endswith("*"):
+            self.prefixes = (*self.prefixes, elem[:-1])
+        else:
+            return False
+        return True
+
+
+class _PathPatternLiteralIndex:
+    """
+    Patterns without wildcards (besides a single ``*`` at the start or end of a pattern with one component),
+    tested using set lookups & string comparisons instead of REGEX.
+    """
+    __slots__ = (
+        # Match the last component (`name`, `*.ext`) or the path when it has a single component (`/*.ext`).
+        "names",
+        "names_root",
+        # Match a path (`/a/b`) or the end of a path (`a/b`).
+        "paths",
+        "tails",
+        # Directory patterns (with a trailing slash), matching any of the directories containing the path
+        # or the first directory (for patterns starting with a slash).
+        "names_dir",
+        "names_root_dir",
+        "paths_dir",
+        "tails_dir",
+    )
+
+    def __init__(self) -> None:
+        self.names = _PathPatternNameSet()
+        self.names_root = _PathPatternNameSet()
+        self.paths: set[str] = set()
+        self.tails: tuple[str, ...] = ()
+
+        self.names_dir = _PathPatternNameSet()
+        self.names_root_dir = _PathPatternNameSet()
+        self.paths_dir: set[str] = set()
+        self.tails_dir: tuple[str, ...] = ()
+
+    def add_or_reject(self, pattern_split: list[str], any_prefix: bool, only_directory: bool) -> bool:
+        """
+        Add a pattern returning true, otherwise false when the pattern must be handled using REGEX.
+        """
+        for elem in pattern_split:
+            if (not elem) or ("?" in elem) or ("[" in elem) or ("\n" in elem):
+                return False
+
+        if len(pattern_split) == 1:
+            if any_prefix:
+                name_set = self.names_dir if only_directory else self.names
+            else:
+                name_set = self.names_root_dir if only_directory else self.names_root
+            return name_set.add_or_reject(pattern_split[0])
+
+        for elem in pattern_split:
+            if "*" in elem:
+                return False
+        path = "/".join(pattern_split)
+        if not any_prefix:
+            (self.paths_dir if only_directory else self.paths).add(path)
+        elif only_directory:
+            self.tails_dir = (*self.tails_dir, "/" + path + "/")
+        else:
+            self.tails = (*self.tails, "/" + path)
+        return True
+
+    def test_fn(self) -> Callable[[str, str], bool] | None:
+        """
+        Return a function to test the patterns which have been added or None when there are no patterns.
+        The function takes a path & the path without a trailing slash, returning true on a match.
+        """
+        # Avoid attribute lookups when testing, as this runs for every path.
+        names, prefixes, suffixes = self.names.names, self.names.prefixes, self.names.suffixes
+        names_root, prefixes_root, suffixes_root = (
+            self.names_root.names, self.names_root.prefixes, self.names_root.suffixes,
+        )
+        paths = self.paths
+        tails = self.tails
+        has_names = bool(names or prefixes)
+        has_root = bool(names_root or prefixes_root or suffixes_root)
+
+        names_dir, prefixes_dir, suffixes_dir = self.names_dir.names, self.names_dir.prefixes, self.names_dir.suffixes
+        names_root_dir, prefixes_root_dir, suffixes_root_dir = (
+            self.names_root_dir.names, self.names_root_dir.prefixes, self.names_root_dir.suffixes,
+        )
+        paths_dir = self.paths_dir
+        tails_dir = self.tails_dir
+        has_affix_dir = bool(prefixes_dir or suffixes_dir)
+        has_root_dir = bool(names_root_dir or prefixes_root_dir or suffixes_root_dir)
+        has_dir = bool(names_dir or has_affix_dir or has_root_dir or paths_dir or tails_dir)
+
+        if not (has_names or suffixes or has_root or paths or tails or has_dir):
+            return None
+
+        def test(path: str, path_strip: str) -> bool:
+            if has_names:
+                name = path_strip[path_strip.rfind("/") + 1:]
+                if (name in names) or (prefixes and name.startswith(prefixes)):
+                    return True
+            # NOTE: a suffix doesn't contain a slash, so the path (instead of the last component) can be tested.
+            if suffixes and path_strip.endswith(suffixes):
+                return True
+            if paths and (path_strip in paths):
+                return True
+            if tails and ("/" + path_strip).endswith(tails):
+                return True
+
+            if "/" not in path_strip:
+                if has_root and (
+                        (path_strip in names_root) or
+                        (prefixes_root and path_strip.startswith(prefixes_root)) or
+                        (suffixes_root and path_strip.endswith(suffixes_root))
+                ):
+                    return True
+                if len(path_strip) == len(path):
+                    # A file without any directories.
+                    return False
+
+            if not has_dir:
+                return False
+
+            # Directories containing the path (including the path itself for directories).
+            dirnames = path.split("/")[:-1]
+            if names_dir and not names_dir.isdisjoint(dirnames):
+                return True
+            if has_affix_dir:
+                for dirname in dirnames:
+                    if prefixes_dir and dirname.startswith(prefixes_dir):
+                        return True
+                    if suffixes_dir and dirname.endswith(suffixes_dir):
+                        return True
+            if has_root_dir:
+                dirname = dirnames[0]
+                if (
+                        (dirname in names_root_dir) or
+                        (prefixes_root_dir and dirname.startswith(prefixes_root_dir)) or
+                        (suffixes_root_dir and dirname.endswith(suffixes_root_dir))
+                ):
+                    return True
+            if paths_dir:
+                i = path.find("/")
+                while i != -1:
+                    if path[:i] in paths_dir:
+                        return True
+                    i = path.find("/", i + 1)
+            if tails_dir:
+                path_test = "/" + path
+                for tail in tails_dir:
+                    if tail in path_test:
+                        return True
+            return False
+
+        return test
+
+
 class PathPatternMatch:
     """
     A pattern matching class that takes a list of patterns and has a ``test_path`` method.
@@ -1107,26 +1797,95 @@ class PathPatternMatch:
     #   to delimit on `/` which is necessary for `gitignore` style matching.
     #   So `/` are replaced with newlines, then REGEX multi-line logic is used
     #   to delimit the separators.
-    # - This is used for building packages, so it doesn't have to be especially fast,
-    #   although it shouldn't cause noticeable delays at build time.
-    # - The test is located in: `../cli/test_path_pattern_match.py`
+    # - This is used for building packages which may contain many files,
+    #   so literal patterns (the most common kind) are tested without REGEX, see `_PathPatternLiteralIndex`.
+    #   Since a path matches when any positive pattern matches & no negative pattern matches,
+    #   positive & negative patterns are each combined into a single test.
+    # - Results & performance are compared with `_test_path_regex_list` in: `benchmark_path_pattern_match.py`.
 
     __slots__ = (
+        "_path_patterns",
         "_regex_list",
+        "_regex_list_only",
+        "_literal_positive_test",
+        "_literal_negative_test",
+        "_regex_positive",
+        "_regex_negative",
     )
 
     def __init__(self, path_patterns: list[str]):
-        self._regex_list: list[tuple[bool, re.Pattern[str]]] = PathPatternMatch._pattern_match_as_regex(path_patterns)
+        self._path_patterns = tuple(path_patterns)
+        # Created on demand as it's only needed for paths containing newlines (or when there are no literal patterns).
+        self._regex_list: list[tuple[bool, re.Pattern[str]]] | None = None
+
+        literal_positive = _PathPatternLiteralIndex()
+        literal_negative = _PathPatternLiteralIndex()
+        regex_positive: list[str] = []
+        regex_negative: list[str] = []
+        for pattern in path_patterns:
+            if pattern.startswith("!"):
+                pattern = pattern.lstrip("!")
+                literal_index, regex_list = literal_negative, regex_negative
+            else:
+                literal_index, regex_list = literal_positive, regex_positive
+            if not pattern:
+                continue
+            if literal_index.add_or_reject(*PathPatternMatch._pattern_normalize(pattern)):
+                continue
+            regex_list.append(PathPatternMatch._pattern_match_as_regex_single(pattern))
+
+        self._literal_positive_test = literal_positive.test_fn()
+        self._literal_negative_test = literal_negative.test_fn()
+        # Without literal patterns, testing each REGEX in order is faster than the combined REGEX.
+        self._regex_list_only = self._literal_positive_test is None and self._literal_negative_test is None
+        self._regex_positive: re.Pattern[str] | None = (
+            re.compile("(?:{:s})".format("|".join(regex_positive)), re.MULTILINE)
+            if (regex_positive and not self._regex_list_only) else None
+        )
+        self._regex_negative: re.Pattern[str] | None = (
+            re.compile("(?:{:s})".format("|".join(regex_negative)), re.MULTILINE)
+            if (regex_negative and not self._regex_list_only) else None
+        )
 
     def test_path(self, path: str) -> bool:
         assert not path.startswith("/")
+        if self._regex_list_only or ("\n" in path):
+            # Newlines are used as separators by the REGEX, use the slower test which handles this.
+            return self._test_path_regex_list(path)
+
+        path_strip = path.rstrip("/")
+        path_test: str | None = None
+
+        # Match any positive pattern.
+        if (test := self._literal_positive_test) is None or not test(path, path_strip):
+            if self._regex_positive is None:
+                return False
+            path_test = path_strip.replace("/", "\n") + path[len(path_strip):]
+            if not self._regex_positive.match(path_test):
+                return False
+
+        # Match no negative pattern.
+        if (test := self._literal_negative_test) is not None and test(path, path_strip):
+            return False
+        if self._regex_negative is not None:
+            if path_test is None:
+                path_test = path_strip.replace("/", "\n") + path[len(path_strip):]
+            if self._regex_negative.match(path_test):
+                return False
+        return True
+
+    # Internal implementation.
+
+    def _test_path_regex_list(self, path: str) -> bool:
         path_test = path.rstrip("/").replace("/", "\n")
         if path.endswith("/"):
             path_test = path_test + "/"
         # For debugging.
         # print("`" + path_test + "`")
+        if (regex_list := self._regex_list) is None:
+            regex_list = self._regex_list = PathPatternMatch._pattern_match_as_regex(self._path_patterns)
         result = False
-        for negate, regex in self._regex_list:
+        for negate, regex in regex_list:
             if regex.match(path_test):
                 if negate:
                     result = False
@@ -1135,12 +1894,12 @@ class PathPatternMatch:
                 result = True
         return result
 
-    # Internal implementation.
-
     @staticmethod
-    def _pattern_match_as_regex_single(pattern: str) -> str:
-        from fnmatch import translate
-
+    def _pattern_normalize(pattern: str) -> tuple[list[str], bool, bool]:
+        """
+        Return the pattern components, true when the pattern may match any prefix
+        and true when the pattern only matches directories.
+        """
         # Special case: `!` literal prefix, needed to avoid this being handled as negation.
         if pattern.startswith("\\!"):
             pattern = pattern[1:]
@@ -1190,7 +1949,13 @@ class PathPatternMatch:
             pattern = pattern.rstrip("/")
 
         # Separate components:
-        pattern_split = pattern.split("/")
+        return pattern.split("/"), any_prefix, only_directory
+
+    @staticmethod
+    def _pattern_match_as_regex_single(pattern: str) -> str:
+        from fnmatch import translate
+
+        pattern_split, any_prefix, only_directory = PathPatternMatch._pattern_normalize(pattern)
 
         pattern_double_star_indices = []
 
@@ -1292,79 +2057,422 @@ class DataRetrieveInfo:
     When accessing a file from a URL or from the file-system,
     this is a "return" argument so the caller can know the size of the chunks it's iterating over,
     or -1 when the size is not known.
+
+    When an ``offset`` is requested, ``offset`` is set to the position the data starts at,
+    this will be zero when the server doesn't support range requests.
     """
     __slots__ = (
         "size_hint",
+        "offset",
     )
     size_hint: int
+    offset: int
 
     def __init__(self) -> None:
         self.size_hint = -1
+        self.offset = 0
 
 
-# Originally based on `urllib.request.urlretrieve`.
-def url_retrieve_to_data_iter(
-        url: str,
-        *,
-        data: Any | None = None,
-        headers: dict[str, str],
-        chunk_size: int,
-        timeout_in_seconds: float,
-        retrieve_info: DataRetrieveInfo,
-) -> Iterator[bytes]:
+class PkgDownloadState:
     """
-    Iterate over byte data downloaded from a URL
-    limited to ``chunk_size``.
-
-    - The ``retrieve_info.size_hint``
-      will be set once the iterator starts and can be used for progress display.
-    - The iterator will start with an empty block, so the size can be known
-      before time is spent downloading data.
+    The state of an archive download which may run in a thread,
+    read by the main thread for progress display.
     """
-    from urllib.error import ContentTooShortError
-    from urllib.request import urlopen
+    __slots__ = (
+        "size_done",
+    )
+    size_done: int
 
-    request = urllib.request.Request(
-        url,
-        data=data,
-        headers=headers,
+    def __init__(self) -> None:
+        self.size_done = 0
+
+
+class TransferLimits(NamedTuple):
+    """
+    Limits for a transfer, zero values disable the limit.
+    """
+    # The maximum time the whole transfer may take.
+    deadline_in_seconds: float
+    # The transfer stalls when fewer than `stall_size` bytes are transferred in `stall_in_seconds`.
+    stall_size: int
+    stall_in_seconds: float
+
+
+TRANSFER_LIMITS_NONE = TransferLimits(0.0, 0, 0.0)
+
+
+class TransferMonitor:
+    """
+    Check the progress of a single transfer against ``TransferLimits``,
+    raising a ``TimeoutError`` when a limit is exceeded.
+
+    Checks are performed between reads, when ``sock`` is set its time-out is reduced before each read,
+    so a read which blocks is interrupted once a limit is exceeded.
+    Otherwise (reading from the file-system for e.g.) a blocking read can't be interrupted.
+
+    The stall limit is checked for consecutive windows of ``stall_in_seconds``.
+    """
+    __slots__ = (
+        "_limits",
+        "_sock",
+        "_timeout_in_seconds",
+        "_time_start",
+        "_stall_time_start",
+        "_stall_size",
     )
 
-    with (
-            urlopen(request, timeout=timeout_in_seconds) if (timeout_in_seconds > 0.0) else
-            urlopen(request)
-    ) as fp:
-        response_headers = fp.info()
+    def __init__(
+            self,
+            limits: TransferLimits,
+            *,
+            sock: socket.socket | None = None,
+            timeout_in_seconds: float = 0.0,
+    ) -> None:
+        self._limits = limits
+        self._sock = sock
+        # The time-out for each read (zero for no time-out).
+        self._timeout_in_seconds = timeout_in_seconds
+        self._time_start = self._stall_time_start = time.monotonic()
+        self._stall_size = 0
+
+    def read_begin(self) -> None:
+        """
+        Set the time-out of the socket for the next read, to the time remaining before a limit is exceeded
+        (when no data arrives), or the read time-out when that's sooner.
+        """
+        limits = self._limits
+        if self._sock is None or limits == TRANSFER_LIMITS_NONE:
+            return
+        time_limit = None
+        if limits.deadline_in_seconds > 0.0:
+            time_limit = self._time_start + limits.deadline_in_seconds
+        if limits.stall_in_seconds > 0.0 and limits.stall_size > 0:
+            time_stall = self._stall_time_start + limits.stall_in_seconds
+            if self._stall_size >= limits.stall_size:
+                # The current window has enough data, the next window stalls when no data arrives.
+                time_stall += limits.stall_in_seconds
+            time_limit = time_stall if time_limit is None else min(time_limit, time_stall)
+
+        timeout = self._timeout_in_seconds if (self._timeout_in_seconds > 0.0) else None
+        if time_limit is not None:
+            # Add a small margin so the limit has been exceeded once the read times out.
+            time_remaining = max(time_limit - time.monotonic(), 0.0) + 0.01
+            timeout = time_remaining if timeout is None else min(timeout, time_remaining)
+        self._sock.settimeout(timeout)
+
+    def update(self, size: int) -> None:
+        limits = self._limits
+        if limits == TRANSFER_LIMITS_NONE:
+            return
+        time_now = time.monotonic()
+
+        if limits.deadline_in_seconds > 0.0:
+            if time_now - self._time_start > limits.deadline_in_seconds:
+                raise TimeoutError("transfer exceeded the deadline of {:g} seconds".format(limits.deadline_in_seconds))
+
+        if limits.stall_in_seconds > 0.0:
+            self._stall_size += size
+            # Data received after a read blocked is counted in the first window which elapsed,
+            # any following window which elapsed while blocking received no data.
+            while (time_stall := time_now - self._stall_time_start) >= limits.stall_in_seconds:
+                if self._stall_size < limits.stall_size:
+                    raise TimeoutError("transfer stalled, {:d} bytes in {:.2f} seconds (expected {:d})".format(
+                        self._stall_size,
+                        min(time_stall, limits.stall_in_seconds),
+                        limits.stall_size,
+                    ))
+                self._stall_time_start += limits.stall_in_seconds
+                self._stall_size = 0
 
-        size = -1
-        read = 0
-        if "content-length" in response_headers:
-            size = int(response_headers["Content-Length"])
 
-        retrieve_info.size_hint = size
+class HTTPConnectionPool:
+    """
+    Persistent (keep-alive) HTTP connections, shared between requests to the same host.
 
-        # Yield an empty block so progress display may start.
-        yield b""
+    A connection is taken from the pool for the duration of a request and returned
+    once the response has been read in full, so downloading the repository listing
+    and multiple archives from one host only performs the TCP/TLS handshake once.
 
-        if timeout_in_seconds <= 0.0:
-            while True:
-                block = fp.read(chunk_size)
-                if not block:
-                    break
-                read += len(block)
-                yield block
+    Connections are never shared between threads while in use.
+    Reuse is checked against local servers by: ``check_http_connection_pool.py``.
+    """
+    __slots__ = (
+        "_lock",
+        "_connections_idle",
+    )
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._connections_idle: dict[tuple[str, str, int | None], list[http.client.HTTPConnection]] = {}
+
+    def acquire(
+            self,
+            key: tuple[str, str, int | None],
+            *,
+            timeout_in_seconds: float,
+    ) -> tuple[http.client.HTTPConnection, bool]:
+        """
+        Return a connection for ``key`` (scheme, host, port) and true when the connection is being reused.
+        """
+        timeout = timeout_in_seconds if (timeout_in_seconds > 0.0) else None
+        with self._lock:
+            if connections := self._connections_idle.get(key):
+                conn = connections.pop()
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+
+        scheme, host, port = key
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(host, port, timeout=timeout)
         else:
-            while True:
-                block = read_with_timeout(fp, chunk_size, timeout_in_seconds=timeout_in_seconds)
-                if not block:
-                    break
+            conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        return conn, False
+
+    def release(self, key: tuple[str, str, int | None], conn: http.client.HTTPConnection) -> None:
+        """
+        Return a connection to the pool, only call once the response has been read in full.
+        """
+        if conn.sock is None:
+            # The connection was closed (the server requested it or an error occurred).
+            return
+        with self._lock:
+            if (connections := self._connections_idle.get(key)) is None:
+                connections = self._connections_idle[key] = []
+            connections.append(conn)
+
+    def clear(self) -> None:
+        with self._lock:
+            connections_all = [conn for connections in self._connections_idle.values() for conn in connections]
+            self._connections_idle.clear()
+        for conn in connections_all:
+            conn.close()
+
+
+# Shared by all requests made by this process.
+URL_CONNECTION_POOL = HTTPConnectionPool()
+
+# Matches `urllib.request.HTTPRedirectHandler.max_redirections`.
+URL_REDIRECT_LIMIT = 10
+
+
+def url_connection_pool_key_or_none(url: str) -> tuple[str, str, int | None] | None:
+    """
+    Return the key used to access a pooled connection for ``url``
+    or None when ``urllib`` must be used to access this URL (when a proxy is in use for e.g.).
+    """
+    parsed_url = urllib.parse.urlsplit(url)
+    scheme = parsed_url.scheme.lower()
+    if scheme not in {"http", "https"}:
+        return None
+    if not (host := parsed_url.hostname):
+        return None
+    # User information in the URL isn't supported by `http.client`.
+    if parsed_url.username is not None:
+        return None
+    # Let `urllib` deal with proxies as it supports the conventional environment variables.
+    if scheme in urllib.request.getproxies() and not urllib.request.proxy_bypass(host):
+        return None
+    try:
+        port = parsed_url.port
+    except ValueError:
+        return None
+    return scheme, host, port
+
+
+def url_response_open_from_pool(
+        url: str,
+        *,
+        data: Any | None,
+        headers: dict[str, str],
+        timeout_in_seconds: float,
+) -> tuple[http.client.HTTPResponse, http.client.HTTPConnection, tuple[str, str, int | None]]:
+    """
+    Make a request using a pooled connection, following redirects.
+
+    Errors are raised using ``urllib`` exceptions so they can be handled
+    the same way as they are when ``urlopen`` is used.
+    The caller must pass the connection to ``URL_CONNECTION_POOL.release`` once the response has been read
+    or close the connection otherwise.
+    """
+    headers = {key.title(): value for key, value in headers.items()}
+    # Match `urllib`, some servers reject requests without a user agent.
+    headers.setdefault("User-Agent", "Python-urllib/{:d}.{:d}".format(*sys.version_info[:2]))
+
+    status = 0
+    for _ in range(URL_REDIRECT_LIMIT + 1):
+        if (key := url_connection_pool_key_or_none(url)) is None:
+            raise urllib.error.URLError("unsupported redirect to: {:s}".format(remote_url_params_strip(url)))
+
+        parsed_url = urllib.parse.urlsplit(url)
+        selector = parsed_url.path or "/"
+        if parsed_url.query:
+            selector = selector + "?" + parsed_url.query
+
+        # A reused connection may have been closed by the server while idle,
+        # in that case retry once using a new connection.
+        while True:
+            conn, is_reused = URL_CONNECTION_POOL.acquire(key, timeout_in_seconds=timeout_in_seconds)
+            try:
+                conn.request("GET" if data is None else "POST", selector, body=data, headers=headers)
+                response = conn.getresponse()
+            except ConnectionError as ex:
+                conn.close()
+                if is_reused:
+                    continue
+                raise urllib.error.URLError(ex) from ex
+            except OSError as ex:
+                conn.close()
+                raise urllib.error.URLError(ex) from ex
+            except BaseException:
+                conn.close()
+                raise
+            break
+
+        status = response.status
+        if status in {301, 302, 303, 307, 308} and (location := response.getheader("Location")):
+            # Read the (typically empty) body so the connection can be reused.
+            try:
+                response.read()
+            except BaseException:
+                conn.close()
+                raise
+            if response.will_close:
+                conn.close()
+            else:
+                URL_CONNECTION_POOL.release(key, conn)
+
+            url = urllib.parse.urljoin(url, location)
+            # Match `urllib`, only 307 & 308 preserve the request method & body.
+            if status not in {307, 308}:
+                data = None
+                headers = {
+                    header_key: header_value for header_key, header_value in headers.items()
+                    if header_key not in {"Content-Length", "Content-Type"}
+                }
+            continue
+
+        if not (200 <= status < 300):
+            conn.close()
+            raise urllib.error.HTTPError(url, status, response.reason, response.headers, None)
+
+        return response, conn, key
+
+    raise urllib.error.HTTPError(
+        url, status, "redirect limit ({:d}) exceeded".format(URL_REDIRECT_LIMIT), http.client.HTTPMessage(), None,
+    )
+
+
+def url_content_range_start_or_error(content_range: str) -> int:
+    """
+    Return the start of a ``Content-Range`` header value, e.g. ``bytes 100-199/200``.
+    """
+    unit, _, content_range = content_range.strip().partition(" ")
+    start, sep, _ = content_range.partition("-")
+    if unit != "bytes" or (not sep) or (not start.isdigit()):
+        raise urllib.error.URLError("unexpected \"Content-Range\": {!r}".format(content_range))
+    return int(start)
+
+
+# Originally based on `urllib.request.urlretrieve`.
+def url_retrieve_to_data_iter(
+        url: str,
+        *,
+        data: Any | None = None,
+        headers: dict[str, str],
+        chunk_size: int,
+        timeout_in_seconds: float,
+        transfer_limits: TransferLimits,
+        retrieve_info: DataRetrieveInfo,
+        offset: int = 0,
+) -> Iterator[bytes | memoryview]:
+    """
+    Iterate over byte data downloaded from a URL
+    starting at ``chunk_size``, see: ``readinto_iter``.
+
+    - The ``retrieve_info.size_hint``
+      will be set once the iterator starts and can be used for progress display.
+    - The iterator will start with an empty block, so the size can be known
+      before time is spent downloading data.
+    - Blocks are only valid until the next iteration.
+    - Connections are kept alive using ``URL_CONNECTION_POOL`` when possible.
+    - A non-zero ``offset`` requests data from this position (using a ``Range`` header),
+      the caller must check ``retrieve_info.offset`` as servers may ignore the range.
+    - A ``TimeoutError`` is raised when a read exceeds ``timeout_in_seconds``
+      or the transfer exceeds ``transfer_limits``.
+    """
+    from urllib.error import ContentTooShortError
+    from urllib.request import urlopen
+
+    if offset:
+        headers = {**headers, "Range": "bytes={:d}-".format(offset)}
+
+    conn: http.client.HTTPConnection | None = None
+    conn_key = None
+    if url_connection_pool_key_or_none(url) is not None:
+        fp_context, conn, conn_key = url_response_open_from_pool(
+            url,
+            data=data,
+            headers=headers,
+            timeout_in_seconds=timeout_in_seconds,
+        )
+    else:
+        request = urllib.request.Request(
+            url,
+            data=data,
+            headers=headers,
+        )
+        fp_context = urlopen(request, timeout=timeout_in_seconds) if (timeout_in_seconds > 0.0) else urlopen(request)
+
+    completed = False
+    try:
+        with fp_context as fp:
+            response_headers = fp.info()
+
+            size = -1
+            read = 0
+            if "content-length" in response_headers:
+                size = int(response_headers["Content-Length"])
+
+            retrieve_info.size_hint = size
+            retrieve_info.offset = 0
+            if offset and (fp.status == 206):
+                retrieve_info.offset = url_content_range_start_or_error(response_headers.get("Content-Range", ""))
+
+            # Yield an empty block so progress display may start.
+            yield b""
+
+            for block in readinto_iter(
+                    fp,
+                    chunk_size=chunk_size,
+                    timeout_in_seconds=timeout_in_seconds,
+                    transfer_monitor=TransferMonitor(
+                        transfer_limits,
+                        # NOTE: the socket isn't accessible when `urlopen` is used (with a proxy),
+                        # in this case blocking reads are only interrupted by the read time-out.
+                        sock=None if conn is None else conn.sock,
+                        timeout_in_seconds=timeout_in_seconds,
+                    ),
+            ):
                 read += len(block)
                 yield block
+            completed = True
+    finally:
+        if conn is not None:
+            assert conn_key is not None
+            # Only reuse connections when the response has been read in full,
+            # otherwise the remaining data would be read as the next response.
+            if completed and (not fp_context.will_close) and (size < 0 or read == size):
+                URL_CONNECTION_POOL.release(conn_key, conn)
+            else:
+                conn.close()
 
     if size >= 0 and read < size:
         raise ContentTooShortError(
             "retrieval incomplete: got only {:d} out of {:d} bytes".format(read, size),
-            response_headers,
+            # NOTE: the headers are passed as `urlopen` responses were, the type stub expects a tuple.
+            response_headers,  # type: ignore
         )
 
 
@@ -1377,20 +2485,30 @@ def url_retrieve_to_filepath_iter(
         data: Any | None = None,
         chunk_size: int,
         timeout_in_seconds: float,
+        transfer_limits: TransferLimits,
         retrieve_info: DataRetrieveInfo,
 ) -> Iterator[int]:
     # Handle temporary file setup.
     with open(filepath, 'wb') as fh_output:
-        for block in url_retrieve_to_data_iter(
-                url,
-                headers=headers,
-                data=data,
-                chunk_size=chunk_size,
-                timeout_in_seconds=timeout_in_seconds,
-                retrieve_info=retrieve_info,
-        ):
-            fh_output.write(block)
-            yield len(block)
+        try:
+            for block in url_retrieve_to_data_iter(
+                    url,
+                    headers=headers,
+                    data=data,
+                    chunk_size=chunk_size,
+                    timeout_in_seconds=timeout_in_seconds,
+                    transfer_limits=transfer_limits,
+                    retrieve_info=retrieve_info,
+            ):
+                if not block:
+                    # The first block, the size is known.
+                    if retrieve_info.size_hint > 0:
+                        file_preallocate(fh_output, retrieve_info.size_hint)
+                fh_output.write(block)
+                yield len(block)
+        finally:
+            # Remove space reserved beyond the data written (when the download didn't complete).
+            fh_output.truncate()
 
 
 # See `url_retrieve_to_data_iter` doc-string.
@@ -1400,18 +2518,30 @@ def filepath_retrieve_to_filepath_iter(
         *,
         chunk_size: int,
         timeout_in_seconds: float,
+        transfer_limits: TransferLimits,
         retrieve_info: DataRetrieveInfo,
 ) -> Iterator[int]:
-    # TODO: `timeout_in_seconds`.
     # Handle temporary file setup.
-    _ = timeout_in_seconds
+    # NOTE: a blocking read from the file-system can't be interrupted,
+    # a read which exceeds the time-out (on a network file-system for example) fails once it returns.
     with open(filepath_src, 'rb') as fh_input:
         retrieve_info.size_hint = os.fstat(fh_input.fileno()).st_size
         yield 0
         with open(filepath, 'wb') as fh_output:
-            while (block := fh_input.read(chunk_size)):
-                fh_output.write(block)
-                yield len(block)
+            if retrieve_info.size_hint > 0:
+                file_preallocate(fh_output, retrieve_info.size_hint)
+            try:
+                for block in readinto_iter(
+                        fh_input,
+                        chunk_size=chunk_size,
+                        timeout_in_seconds=timeout_in_seconds,
+                        transfer_monitor=TransferMonitor(transfer_limits),
+                ):
+                    fh_output.write(block)
+                    yield len(block)
+            finally:
+                # Remove space reserved beyond the data written (when the copy didn't complete).
+                fh_output.truncate()
 
 
 def url_retrieve_to_data_iter_or_filesystem(
@@ -1420,21 +2550,35 @@ def url_retrieve_to_data_iter_or_filesystem(
         *,
         chunk_size: int,
         timeout_in_seconds: float,
+        transfer_limits: TransferLimits,
         retrieve_info: DataRetrieveInfo,
-) -> Iterator[bytes]:
+        offset: int = 0,
+) -> Iterator[bytes | memoryview]:
     if url_is_filesystem(url):
         with open(path_from_url(url), "rb") as fh_source:
-            retrieve_info.size_hint = os.fstat(fh_source.fileno()).st_size
+            size = os.fstat(fh_source.fileno()).st_size
+            if offset and (offset < size):
+                fh_source.seek(offset)
+                retrieve_info.offset = offset
+            else:
+                retrieve_info.offset = 0
+            retrieve_info.size_hint = size - retrieve_info.offset
             yield b""
-            while (block := fh_source.read(chunk_size)):
-                yield block
+            yield from readinto_iter(
+                fh_source,
+                chunk_size=chunk_size,
+                timeout_in_seconds=timeout_in_seconds,
+                transfer_monitor=TransferMonitor(transfer_limits),
+            )
     else:
         yield from url_retrieve_to_data_iter(
             url,
             headers=headers,
             chunk_size=chunk_size,
             timeout_in_seconds=timeout_in_seconds,
+            transfer_limits=transfer_limits,
             retrieve_info=retrieve_info,
+            offset=offset,
         )
 
 
@@ -1446,6 +2590,7 @@ def url_retrieve_to_filepath_iter_or_filesystem(
         headers: dict[str, str],
         chunk_size: int,
         timeout_in_seconds: float,
+        transfer_limits: TransferLimits,
         retrieve_info: DataRetrieveInfo,
 ) -> Iterator[int]:
     """
@@ -1458,6 +2603,7 @@ def url_retrieve_to_filepath_iter_or_filesystem(
             filepath,
             chunk_size=chunk_size,
             timeout_in_seconds=timeout_in_seconds,
+            transfer_limits=transfer_limits,
             retrieve_info=retrieve_info,
         )
     else:
@@ -1467,6 +2613,7 @@ def url_retrieve_to_filepath_iter_or_filesystem(
             headers=headers,
             chunk_size=chunk_size,
             timeout_in_seconds=timeout_in_seconds,
+            transfer_limits=transfer_limits,
             retrieve_info=retrieve_info,
         )
 
@@ -2368,6 +3515,26 @@ def paths_filter_wheels_by_platform(
     return wheels_result
 
 
+def pkg_zipfile_members_filter_wheels_by_platform(
+        members: Sequence[zipfile.ZipInfo],
+        wheels: list[str],
+        platform: str,
+) -> list[zipfile.ZipInfo]:
+    """
+    Return ``members`` without the ``wheels`` (paths from the manifest) which aren't compatible with the ``platform``.
+    """
+    wheels_skip = {
+        os.path.normpath(wheel).replace("\\", "/")
+        for wheel in wheels
+        # Manifests which aren't strictly validated may contain invalid wheel names, keep these.
+        if len(os.path.splitext(os.path.basename(wheel))[0].split("-")) >= 5
+        if not blender_platform_compatible_with_wheel_platform_from_filepath(platform, wheel)
+    }
+    if not wheels_skip:
+        return list(members)
+    return [member for member in members if member.filename not in wheels_skip]
+
+
 def build_paths_filter_wheels_by_platform(
         build_paths: list[tuple[str, str]],
         platform: str,
@@ -2385,6 +3552,24 @@ def build_paths_filter_wheels_by_platform(
     return build_paths_for_platform
 
 
+def build_workspace_source_dirs_or_error(filepath: str) -> list[str] | str:
+    """
+    Return the package source directories listed in a workspace file, one directory per line
+    (relative to the workspace file), ignoring blank lines & lines starting with a ``#``.
+    """
+    try:
+        with open(filepath, "r", encoding="utf-8") as fh:
+            lines = fh.read().splitlines()
+    except Exception as ex:
+        return str(ex)
+    dirpath = os.path.dirname(filepath)
+    return [
+        os.path.join(dirpath, line)
+        for line in (line.strip() for line in lines)
+        if line and not line.startswith("#")
+    ]
+
+
 def build_paths_filter_by_platform(
         build_paths: list[tuple[str, str]],
         wheel_range: tuple[int, int],
@@ -2967,6 +4152,7 @@ def repo_sync_from_remote(
         online_user_agent: str,
         access_token: str,
         timeout_in_seconds: float,
+        transfer_limits: TransferLimits,
         demote_connection_errors_to_status: bool,
         extension_override: str,
 ) -> bool:
@@ -3023,6 +4209,7 @@ def repo_sync_from_remote(
                     ),
                     chunk_size=CHUNK_SIZE_DEFAULT,
                     timeout_in_seconds=timeout_in_seconds,
+                    transfer_limits=transfer_limits,
                     retrieve_info=retrieve_info,
             ):
                 request_exit |= msglog.progress("Downloading...", read_total, retrieve_info.size_hint, 'BYTE')
@@ -3133,93 +4320,1202 @@ def url_is_filesystem(url: str) -> bool:
 
 
 # -----------------------------------------------------------------------------
-# Generate Argument Handlers
+# Shared Archive Cache
 
-def arg_handle_int_as_bool(value: str) -> bool:
-    result = int(value)
-    if result not in {0, 1}:
-        raise argparse.ArgumentTypeError("Expected a 0 or 1")
-    return bool(result)
+class FileLockContext:
+    """
+    An exclusive lock between processes, using a lock file.
+    """
+    __slots__ = (
+        "filepath",
+        "_fh",
+    )
 
+    def __init__(self, filepath: str) -> None:
+        self.filepath = filepath
+        self._fh: IO[bytes] | None = None
 
-def arg_handle_str_as_package_names(value: str) -> Sequence[str]:
-    result = value.split(",")
-    for pkg_idname in result:
-        if (error_msg := pkg_idname_is_valid_or_error(pkg_idname)) is not None:
-            raise argparse.ArgumentTypeError("Invalid name \"{:s}\". {:s}".format(pkg_idname, error_msg))
-    return result
+    def __enter__(self) -> "FileLockContext":
+        # pylint: disable-next=consider-using-with
+        fh = open(self.filepath, "a+b")
+        try:
+            if sys.platform == "win32":
+                import msvcrt
+                fh.seek(0)
+                while True:
+                    try:
+                        # Blocks for up to 10 seconds, then raises.
+                        msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        pass
+            else:
+                import fcntl
+                fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+        except BaseException:
+            fh.close()
+            raise
+        self._fh = fh
+        return self
 
+    def __exit__(self, _ty: Any, _value: Any, _traceback: Any) -> None:
+        fh = self._fh
+        assert fh is not None
+        self._fh = None
+        try:
+            if sys.platform == "win32":
+                import msvcrt
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+        finally:
+            fh.close()
 
-def arg_handle_str_as_temp_prefix_and_suffix(value: str) -> tuple[str, str]:
-    if (value.count("/") != 1) and (len(value) > 1):
-        raise argparse.ArgumentTypeError("Must contain a \"/\" character with a prefix and/or suffix")
-    a, b = value.split("/", 1)
-    return a, b
 
+def file_link_or_copy(filepath_src: str, filepath_dst: str) -> None:
+    """
+    Hard-link ``filepath_src`` to ``filepath_dst``, falling back to a copy
+    (across file-systems or when links aren't supported).
+    ``filepath_dst`` is replaced atomically.
+    """
+    filepath_dst_temp = filepath_dst + "@"
+    if os.path.lexists(filepath_dst_temp):
+        os.unlink(filepath_dst_temp)
+    try:
+        os.link(filepath_src, filepath_dst_temp)
+    except OSError:
+        shutil.copyfile(filepath_src, filepath_dst_temp)
+    os.replace(filepath_dst_temp, filepath_dst)
 
-# -----------------------------------------------------------------------------
-# Argument Handlers ("build" command)
 
-def generic_arg_build_split_platforms(subparse: argparse.ArgumentParser) -> None:
-    subparse.add_argument(
-        "--split-platforms",
-        dest="split_platforms",
-        action="store_true",
-        default=False,
-        help=(
-            "Build a separate package for each platform.\n"
-            "Adding the platform as a file name suffix (before the extension).\n"
-            "\n"
-            "This can be useful to reduce the upload size of packages that bundle large\n"
-            "platform-specific modules (``*.whl`` files)."
-        ),
+class ArchiveCacheShared:
+    """
+    A cache of package archives shared between repositories (and Blender versions),
+    addressed by the archive hash: ``<directory>/<hash[:2]>/<hash>.zip``.
+
+    The size & last use of each archive is stored in ``index.json``
+    so the least recently used archives can be removed once the cache exceeds its budget.
+    The index is only accessed while holding a lock, so multiple processes may use the cache at once.
+    Archives are added atomically and are only added once they have been validated.
+    """
+    __slots__ = (
+        "directory",
+        "size_budget",
     )
 
+    INDEX_FILENAME = "index.json"
+    LOCK_FILENAME = "index.lock"
 
-def generic_arg_package_valid_tags(subparse: argparse.ArgumentParser) -> None:
-    # NOTE(@ideasman42): when called from Blender tags for `extensions.blender.org` are enforced by default.
-    # For `extensions.blender.org` this is enforced on the server side, so it's better developers see the error
-    # on build/validate instead of uploading the package.
-    # It's worth noting not all extensions will be hosted on `extensions.blender.org`,
-    # 3rd party hosting should remain a first class citizen not some exceptional case.
-    #
-    # The rationale for applying these tags for all packages even accepting that not everyone is targeting
-    # Blender's official repository is to avoid every extension defining their own tags.
-    #
-    # This has two down sides:
-    # - Duplicate similar tags, e.g. `"render", "rendering"`, `"toon", "cartoon"` etc.
-    # - Tag proliferation (100's of tags), makes the UI unusable.
-    #   So even when all tags are valid and named well, having everyone defining
-    #   their own tags results the user having to filter between too many options.
-    #   Although a re-designed UI could account for this if it were important.
-    #
-    # Nevertheless, allow motivated developers to ignore the tags limitations as it's somewhat arbitrarily.
-    # The default to apply these limits is a "nudge" to avoid additional tags from typos as well as a hint
-    # that tags should be added to Blender's list if they're needed instead of being defined ad-hoc.
+    def __init__(self, directory: str, size_budget: int) -> None:
+        self.directory = directory
+        # Zero for no limit.
+        self.size_budget = size_budget
 
-    subparse.add_argument(
-        "--valid-tags",
-        dest="valid_tags_filepath",
-        default=ARG_DEFAULTS_OVERRIDE.build_valid_tags,
-        metavar="VALID_TAGS_JSON",
-        # NOTE(@ideasman42): Python input is also supported, intentionally undocumented for now,
-        # since this is only supported as Blender's tags happen to be stored as a Python script - which may change.
-        help=(
-            "Reference a file path containing valid tags lists.\n"
-            "\n"
-            "If you wish to reference custom tags a ``.json`` file can be used.\n"
-            "The contents must be a dictionary of lists where the ``key`` matches the extension type.\n"
-            "\n"
-            "For example:\n"
-            "   ``{\"add-ons\": [\"Example\", \"Another\"], \"theme\": [\"Other\", \"Tags\"]}``\n"
-            "\n"
-            "To disable validating tags, pass in an empty path ``--valid-tags=\"\"``."
-        ),
-    )
+    def _filepath_from_hash(self, archive_hash: str) -> str:
+        hash_hex = archive_hash.removeprefix("sha256:")
+        return os.path.join(self.directory, hash_hex[:2], hash_hex + PKG_EXT)
 
+    def _lock(self) -> FileLockContext:
+        os.makedirs(self.directory, exist_ok=True)
+        return FileLockContext(os.path.join(self.directory, self.LOCK_FILENAME))
 
-# -----------------------------------------------------------------------------
-# Argument Handlers ("server-generate" command)
+    def _index_load(self) -> dict[str, dict[str, Any]]:
+        try:
+            with open(os.path.join(self.directory, self.INDEX_FILENAME), "r", encoding="utf-8") as fh:
+                result = json.load(fh)
+        except FileNotFoundError:
+            return {}
+        except Exception:
+            # A corrupt index only loses the order archives were used in.
+            return {}
+        if not isinstance(result, dict) or not isinstance(entries := result.get("entries"), dict):
+            return {}
+        return entries
+
+    def _index_save(self, entries: dict[str, dict[str, Any]]) -> None:
+        filepath = os.path.join(self.directory, self.INDEX_FILENAME)
+        with open(filepath + "@", "w", encoding="utf-8") as fh:
+            json.dump({"version": 1, "entries": entries}, fh, indent=0)
+        os.replace(filepath + "@", filepath)
+
+    def copy_to_filepath_or_error(self, archive_hash: str, archive_size: int, filepath: str) -> bool | str:
+        """
+        Link (or copy) the archive into ``filepath``, return true when the archive is in the cache.
+
+        The archive is hashed once linked, as the cache may have been modified by another process
+        (or corrupted), in this case the archive is removed from the cache.
+        """
+        filepath_cache = self._filepath_from_hash(archive_hash)
+        try:
+            with self._lock():
+                entries = self._index_load()
+                if (entry := entries.get(archive_hash)) is None:
+                    return False
+                try:
+                    found = os.path.getsize(filepath_cache) == archive_size
+                except FileNotFoundError:
+                    found = False
+                if found:
+                    file_link_or_copy(filepath_cache, filepath)
+                    if sha256_from_file_or_error(filepath, hash_prefix=True) != (archive_size, archive_hash):
+                        found = False
+                        os.unlink(filepath)
+                if found:
+                    entry["used"] = time.time()
+                else:
+                    del entries[archive_hash]
+                    # Otherwise the invalid archive would be kept when the archive is added again.
+                    if os.path.lexists(filepath_cache):
+                        os.unlink(filepath_cache)
+                self._index_save(entries)
+        except Exception as ex:
+            return "shared cache error: {:s}".format(str(ex))
+        return found
+
+    def add_from_filepath_or_error(self, archive_hash: str, archive_size: int, filepath: str) -> str | None:
+        """
+        Add a validated archive to the cache (or mark it as used when it's already cached),
+        removing the least recently used archives which exceed the budget.
+        """
+        filepath_cache = self._filepath_from_hash(archive_hash)
+        try:
+            with self._lock():
+                entries = self._index_load()
+                if not os.path.exists(filepath_cache):
+                    os.makedirs(os.path.dirname(filepath_cache), exist_ok=True)
+                    file_link_or_copy(filepath, filepath_cache)
+                entries[archive_hash] = {"size": archive_size, "used": time.time()}
+                self._evict(entries, keep=archive_hash)
+                self._index_save(entries)
+        except Exception as ex:
+            return "shared cache error: {:s}".format(str(ex))
+        return None
+
+    def _evict(self, entries: dict[str, dict[str, Any]], *, keep: str) -> None:
+        if self.size_budget <= 0:
+            return
+        size_total = sum(entry.get("size", 0) for entry in entries.values())
+        if size_total <= self.size_budget:
+            return
+        for archive_hash, entry in sorted(entries.items(), key=lambda item: item[1].get("used", 0.0)):
+            if size_total <= self.size_budget:
+                break
+            if archive_hash == keep:
+                continue
+            try:
+                os.unlink(self._filepath_from_hash(archive_hash))
+            except FileNotFoundError:
+                pass
+            size_total -= entry.get("size", 0)
+            del entries[archive_hash]
+
+
+WHEEL_STORE_LOCK_FILENAME = "store.lock"
+
+
+def wheel_store_lock(store_dir: str) -> FileLockContext:
+    """
+    Lock the store while wheels are added & linked or removed,
+    otherwise another process may remove a wheel before it's linked.
+    """
+    return FileLockContext(os.path.join(store_dir, WHEEL_STORE_LOCK_FILENAME))
+
+
+def wheel_store_link_test_or_error(store_dir: str, local_dir: str) -> str | None:
+    """
+    Return an error when files in the store can't be hard-linked into ``local_dir``.
+
+    Unused wheels are detected by their number of links,
+    so the store can't be used when extensions would contain copies.
+    """
+    filepath_src = os.path.join(store_dir, "link_test@{:d}".format(os.getpid()))
+    filepath_dst = os.path.join(local_dir, ".link_test@{:d}".format(os.getpid()))
+    try:
+        with open(filepath_src, "wb"):
+            pass
+        try:
+            os.link(filepath_src, filepath_dst)
+            os.unlink(filepath_dst)
+        finally:
+            os.unlink(filepath_src)
+    except OSError as ex:
+        return str(ex)
+    return None
+
+
+def wheel_store_extract_members(
+        zip_fh: zipfile.ZipFile,
+        members: Sequence[zipfile.ZipInfo],
+        path: str,
+        store_dir: str,
+) -> None:
+    """
+    Extract wheels by linking them from ``store_dir`` (as ``<sha256>.whl``), adding wheels missing from the store.
+
+    The hash is always calculated from the archive,
+    so a wheel in the store can't be substituted for a wheel with different contents.
+    Each members filename must be simple, see: ``zipfile_member_path_is_simple``.
+    """
+    members_with_hash: list[tuple[zipfile.ZipInfo, str]] = []
+    for member in members:
+        sha256 = hashlib.new('sha256')
+        with zip_fh.open(member) as fh_src:
+            while (block := fh_src.read(CHUNK_SIZE_MAX)):
+                sha256.update(block)
+        members_with_hash.append((member, sha256.hexdigest()))
+
+    with wheel_store_lock(store_dir):
+        for member, sha256_hex in members_with_hash:
+            filepath_store = os.path.join(store_dir, sha256_hex + ".whl")
+            try:
+                found = os.path.getsize(filepath_store) == member.file_size
+            except FileNotFoundError:
+                found = False
+            if not found:
+                filepath_store_temp = filepath_store + "@"
+                with zip_fh.open(member) as fh_src, open(filepath_store_temp, "wb") as fh_dst:
+                    shutil.copyfileobj(fh_src, fh_dst, CHUNK_SIZE_MAX)
+                os.replace(filepath_store_temp, filepath_store)
+
+            filepath_dst = os.path.join(path, *member.filename.split("/"))
+            os.makedirs(os.path.dirname(filepath_dst), exist_ok=True)
+            file_link_or_copy(filepath_store, filepath_dst)
+
+
+def wheel_store_remove_unused(store_dir: str) -> None:
+    """
+    Remove wheels from the store which aren't linked into any installed extension.
+
+    Wheels linked into directories left for the "gc" command (see ``RemovalReaper``) are kept
+    as they have more than one link, once these directories are removed "gc" removes the wheels.
+    """
+    if not os.path.isdir(store_dir):
+        return
+    with wheel_store_lock(store_dir):
+        for entry in list(os.scandir(store_dir)):
+            if not entry.name.endswith(".whl"):
+                continue
+            try:
+                if os.stat(entry.path).st_nlink <= 1:
+                    os.unlink(entry.path)
+            except OSError:
+                pass
+
+
+# -----------------------------------------------------------------------------
+# Package Install Record
+#
+# The record stores the size, CRC32 & modification time of each file extracted from a package archive,
+# so an upgrade only needs to write the files which changed and installed files can be verified.
+
+def zipfile_extract_members_for_install(
+        zip_fh: zipfile.ZipFile,
+        members: Sequence[zipfile.ZipInfo],
+        filepath_archive: str,
+        path: str,
+        *,
+        extract_jobs: int,
+        wheel_store_dir: str,
+) -> None:
+    members_wheel: list[zipfile.ZipInfo] = []
+    if wheel_store_dir:
+        # Wheels are linked from the store instead of being extracted.
+        members_wheel = [
+            member for member in members
+            if member.filename.lower().endswith(".whl") and zipfile_member_path_is_simple(member.filename)
+        ]
+        if members_wheel:
+            members_wheel_set = set(members_wheel)
+            members = [member for member in members if member not in members_wheel_set]
+            del members_wheel_set
+
+    if extract_jobs > 1 and len(members) >= EXTRACT_PARALLEL_MEMBERS_MIN:
+        zipfile_extract_members_parallel(
+            zip_fh,
+            members,
+            filepath_archive,
+            path,
+            jobs=extract_jobs,
+        )
+    else:
+        for member in members:
+            zip_fh.extract(member, path)
+    if members_wheel:
+        wheel_store_extract_members(zip_fh, members_wheel, path, wheel_store_dir)
+
+
+def pkg_record_from_members(members: Sequence[zipfile.ZipInfo]) -> dict[str, tuple[int, int]] | None:
+    """
+    Return a record of ``members``: ``{path: (size, crc32)}``,
+    or None when a path can't be recorded (when it would be sanitized on extraction).
+    """
+    record = {}
+    for member in members:
+        if member.is_dir():
+            continue
+        if not zipfile_member_path_is_simple(member.filename):
+            return None
+        record[member.filename] = (member.file_size, member.CRC)
+    return record
+
+
+def pkg_record_write(dirpath: str, record: dict[str, tuple[int, int]]) -> None:
+    """
+    Write ``record`` (from ``pkg_record_from_members``) into ``dirpath``,
+    which must contain the extracted files, as their modification time is recorded too.
+    """
+    files = {}
+    for path, (size, crc) in record.items():
+        st = os.stat(os.path.join(dirpath, *path.split("/")))
+        files[path] = [size, crc, st.st_mtime_ns]
+
+    filepath = os.path.join(dirpath, PKG_RECORD_FILENAME)
+    with open(filepath + "@", "w", encoding="utf-8") as fh:
+        json.dump({"version": 1, "files": files}, fh, indent=0)
+    os.replace(filepath + "@", filepath)
+
+
+def pkg_record_read_or_none(dirpath: str) -> dict[str, tuple[int, int, int]] | None:
+    """
+    Return the record: ``{path: (size, crc32, mtime_ns)}`` or None when there is no valid record.
+    """
+    try:
+        with open(os.path.join(dirpath, PKG_RECORD_FILENAME), "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+        return {path: (size, crc, mtime_ns) for path, (size, crc, mtime_ns) in data["files"].items()}
+    except Exception:
+        # Missing or invalid (from an older version for example).
+        return None
+
+
+def pkg_record_verify(
+        dirpath: str,
+        record: dict[str, tuple[int, int, int]],
+        *,
+        content: bool,
+) -> tuple[list[str], list[str]]:
+    """
+    Return the modified & missing paths of an installed package.
+
+    Files which match the recorded size & modification time are considered unchanged
+    unless ``content`` is true, in this case the CRC32 of every file is checked.
+    Otherwise the CRC32 is only checked for files with a different modification time.
+    """
+    paths_modified = []
+    paths_missing = []
+    for path, (size, crc, mtime_ns) in record.items():
+        filepath = os.path.join(dirpath, *path.split("/"))
+        try:
+            st = os.stat(filepath)
+        except FileNotFoundError:
+            paths_missing.append(path)
+            continue
+        except OSError:
+            paths_modified.append(path)
+            continue
+
+        if st.st_size != size:
+            paths_modified.append(path)
+            continue
+        # When the time changed the contents may not have, fall back to a content check.
+        if (not content) and st.st_mtime_ns == mtime_ns:
+            continue
+
+        crc_test = 0
+        try:
+            with open(filepath, "rb") as fh:
+                while chunk := fh.read(CHUNK_SIZE_MAX):
+                    crc_test = zlib.crc32(chunk, crc_test)
+        except OSError:
+            crc_test = -1
+        if crc_test != crc:
+            paths_modified.append(path)
+
+    return paths_modified, paths_missing
+
+
+def pkg_delta_journal_filepath(filepath_local_pkg: str) -> str:
+    return filepath_local_pkg + "@journal.json"
+
+
+def pkg_delta_backup_dirpath(filepath_local_pkg: str) -> str:
+    return filepath_local_pkg + "@backup"
+
+
+def pkg_delta_rollback(filepath_local_pkg: str, paths: Sequence[tuple[str, bool]]) -> None:
+    """
+    Restore the files in ``paths``: ``(path, existed)`` from the backup directory
+    and remove files which didn't exist before the upgrade.
+    Paths which haven't been modified are left as-is, so this is safe to run after any failure.
+    """
+    backup_dir = pkg_delta_backup_dirpath(filepath_local_pkg)
+    for path, existed in reversed(paths):
+        filepath = os.path.join(filepath_local_pkg, *path.split("/"))
+        if existed:
+            filepath_backup = os.path.join(backup_dir, *path.split("/"))
+            if os.path.lexists(filepath_backup):
+                os.makedirs(os.path.dirname(filepath), exist_ok=True)
+                os.replace(filepath_backup, filepath)
+        elif os.path.lexists(filepath):
+            os.unlink(filepath)
+
+
+def pkg_delta_journal_rollback_or_error(filepath_local_pkg: str) -> str | None:
+    """
+    Roll back an upgrade which didn't complete (the process exited for example).
+    """
+    filepath_journal = pkg_delta_journal_filepath(filepath_local_pkg)
+    backup_dir = pkg_delta_backup_dirpath(filepath_local_pkg)
+    try:
+        if os.path.exists(filepath_journal):
+            with open(filepath_journal, "r", encoding="utf-8") as fh:
+                paths = [(path, existed) for path, existed in json.load(fh)["paths"]]
+            pkg_delta_rollback(filepath_local_pkg, paths)
+            os.unlink(filepath_journal)
+        if os.path.lexists(backup_dir):
+            if (error := rmtree_with_fallback_or_error(backup_dir)) is not None:
+                return error
+    except Exception as ex:
+        return str(ex)
+    return None
+
+
+def pkg_delta_upgrade_or_error(
+        zip_fh: zipfile.ZipFile,
+        members: Sequence[zipfile.ZipInfo],
+        filepath_archive: str,
+        filepath_local_pkg: str,
+        filepath_local_pkg_temp: str,
+        *,
+        record_old: dict[str, tuple[int, int, int]],
+        record_new: dict[str, tuple[int, int]],
+        extract_jobs: int,
+        wheel_store_dir: str,
+) -> tuple[int, int] | str:
+    """
+    Upgrade an installed package to ``members``, only writing files which differ from ``record_old``
+    or which were modified or removed since they were installed.
+    Return the number of files written & removed.
+
+    Changed files are extracted into ``filepath_local_pkg_temp``, then moved into place
+    while the files they replace are moved into a backup directory.
+    A journal of the files being modified is written first,
+    so a failed upgrade is rolled back (immediately or the next time the package is accessed).
+    """
+    # Files changed on disk no longer match the record, so they must be written too.
+    paths_modified, paths_missing = pkg_record_verify(filepath_local_pkg, record_old, content=False)
+    paths_stale = set(paths_modified)
+    paths_stale.update(paths_missing)
+    del paths_modified, paths_missing
+
+    members_changed = [
+        member for member in members
+        if (not member.is_dir()) and (
+            (member.filename in paths_stale) or
+            (record_old.get(member.filename, ())[:2] != record_new[member.filename])
+        )
+    ]
+    paths_changed = [member.filename for member in members_changed]
+    paths_removed = [path for path in record_old.keys() if path not in record_new]
+
+    zipfile_extract_members_for_install(
+        zip_fh,
+        members_changed,
+        filepath_archive,
+        filepath_local_pkg_temp,
+        extract_jobs=extract_jobs,
+        wheel_store_dir=wheel_store_dir,
+    )
+
+    # Directories (which may be empty).
+    for member in members:
+        if member.is_dir() and zipfile_member_path_is_simple(member.filename.rstrip("/")):
+            os.makedirs(os.path.join(filepath_local_pkg, *member.filename.rstrip("/").split("/")), exist_ok=True)
+
+    # The record is replaced too, so a rollback restores the record which matches the files.
+    paths = [
+        (path, os.path.lexists(os.path.join(filepath_local_pkg, *path.split("/"))))
+        for path in (*paths_changed, *paths_removed, PKG_RECORD_FILENAME)
+    ]
+
+    filepath_journal = pkg_delta_journal_filepath(filepath_local_pkg)
+    backup_dir = pkg_delta_backup_dirpath(filepath_local_pkg)
+    with open(filepath_journal, "w", encoding="utf-8") as fh:
+        json.dump({"paths": paths}, fh)
+        fh.flush()
+        os.fsync(fh.fileno())
+
+    try:
+        paths_changed_set = set(paths_changed)
+        for path, existed in paths:
+            path_parts = path.split("/")
+            filepath = os.path.join(filepath_local_pkg, *path_parts)
+            if existed:
+                filepath_backup = os.path.join(backup_dir, *path_parts)
+                os.makedirs(os.path.dirname(filepath_backup), exist_ok=True)
+                os.replace(filepath, filepath_backup)
+            if path in paths_changed_set:
+                os.makedirs(os.path.dirname(filepath), exist_ok=True)
+                os.replace(os.path.join(filepath_local_pkg_temp, *path_parts), filepath)
+        pkg_record_write(filepath_local_pkg, record_new)
+    except BaseException:
+        pkg_delta_rollback(filepath_local_pkg, paths)
+        os.unlink(filepath_journal)
+        rmtree_with_fallback_or_error(backup_dir)
+        raise
+
+    # The upgrade is complete once the journal is removed.
+    os.unlink(filepath_journal)
+    rmtree_with_fallback_or_error(backup_dir)
+
+    # Remove directories left empty.
+    for path in paths_removed:
+        dirpath = os.path.dirname(os.path.join(filepath_local_pkg, *path.split("/")))
+        while os.path.normpath(dirpath) != os.path.normpath(filepath_local_pkg):
+            try:
+                os.rmdir(dirpath)
+            except OSError:
+                break
+            dirpath = os.path.dirname(dirpath)
+
+    return len(paths_changed), len(paths_removed)
+
+
+# -----------------------------------------------------------------------------
+# Bytecode Compilation
+
+def bytecode_compile_or_error(filepath: str) -> str | None:
+    """
+    Compile ``filepath`` to bytecode for the running Python version, unless the bytecode is up to date.
+    """
+    import importlib.util
+    import py_compile
+    try:
+        st = os.stat(filepath)
+        filepath_cache = importlib.util.cache_from_source(filepath)
+        # Matches the header of time-stamp based bytecode, see: PEP 552.
+        header = b"".join((
+            importlib.util.MAGIC_NUMBER,
+            b"\0\0\0\0",
+            (int(st.st_mtime) & 0xFFFFFFFF).to_bytes(4, "little"),
+            (st.st_size & 0xFFFFFFFF).to_bytes(4, "little"),
+        ))
+        try:
+            with open(filepath_cache, "rb") as fh:
+                if fh.read(len(header)) == header:
+                    return None
+        except FileNotFoundError:
+            pass
+        py_compile.compile(filepath, cfile=filepath_cache, doraise=True)
+    except py_compile.PyCompileError as ex:
+        # Use a single line (the message includes the source line).
+        return "{:s}: {:s}".format(ex.exc_type_name, str(ex.exc_value))
+    except Exception as ex:
+        return str(ex)
+    return None
+
+
+class BytecodeCompiler:
+    """
+    Compile the Python files of installed packages using a pool of processes (created on demand).
+    """
+    __slots__ = (
+        "_jobs",
+        "_executor",
+    )
+
+    def __init__(self, *, jobs: int) -> None:
+        import concurrent.futures
+        self._jobs = jobs
+        self._executor: concurrent.futures.ProcessPoolExecutor | None = None
+
+    def compile_dir(self, path: str) -> tuple[int, list[tuple[str, str]]]:
+        """
+        Return the number of Python files & the errors: ``(filepath, error)`` for files which failed to compile.
+        """
+        filepaths: list[str] = []
+        for root, dirs, files in os.walk(path):
+            dirs[:] = [dirname for dirname in dirs if dirname != "__pycache__"]
+            filepaths.extend(os.path.join(root, filename) for filename in files if filename.endswith(".py"))
+
+        results: Iterator[str | None] = iter(())
+        if self._jobs > 1 and len(filepaths) > 1:
+            if self._executor is None:
+                import concurrent.futures
+                try:
+                    self._executor = concurrent.futures.ProcessPoolExecutor(max_workers=self._jobs)
+                except Exception:
+                    # Not all platforms support process pools.
+                    self._jobs = 1
+            if self._executor is not None:
+                results = self._executor.map(
+                    bytecode_compile_or_error,
+                    filepaths,
+                    chunksize=max(1, min(32, len(filepaths) // (self._jobs * 4))),
+                )
+        if self._executor is None:
+            results = map(bytecode_compile_or_error, filepaths)
+
+        errors = [(filepath, error) for filepath, error in zip(filepaths, results) if error is not None]
+        return len(filepaths), errors
+
+    def __enter__(self) -> "BytecodeCompiler":
+        return self
+
+    def __exit__(self, _ty: Any, _value: Any, _traceback: Any) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+def bytecode_compile_python_version_or_error(python_version_tuple: tuple[int, int, int]) -> str | None:
+    # Bytecode can only be generated for the running Python version (unset when zero).
+    if python_version_tuple != (0, 0, 0) and python_version_tuple[:2] != sys.version_info[:2]:
+        return "Python {:d}.{:d} is required, found {:d}.{:d}".format(
+            *python_version_tuple[:2],
+            *sys.version_info[:2],
+        )
+    return None
+
+
+# -----------------------------------------------------------------------------
+# Reproducible Build
+
+def build_reproducible_date_time_or_error() -> tuple[int, int, int, int, int, int] | str:
+    """
+    Return the time-stamp used for all files in a reproducible build.
+    Use ``SOURCE_DATE_EPOCH`` when set, see: https://reproducible-builds.org/specs/source-date-epoch/
+    """
+    if not (value := os.environ.get("SOURCE_DATE_EPOCH", "")):
+        # The earliest time-stamp ZIP files support.
+        return (1980, 1, 1, 0, 0, 0)
+    try:
+        t = time.gmtime(int(value))
+    except (ValueError, OverflowError, OSError):
+        return "SOURCE_DATE_EPOCH must be a time-stamp in seconds, found \"{:s}\"".format(value)
+    date_time = (t.tm_year, t.tm_mon, t.tm_mday, t.tm_hour, t.tm_min, t.tm_sec)
+    # Clamp to the range ZIP files support.
+    if date_time[0] < 1980:
+        return (1980, 1, 1, 0, 0, 0)
+    if date_time[0] > 2107:
+        return (2107, 12, 31, 23, 59, 58)
+    return date_time
+
+
+def zipfile_info_from_file(
+        filepath_abs: str,
+        filepath_rel: str,
+        date_time: tuple[int, int, int, int, int, int] | None,
+) -> zipfile.ZipInfo:
+    """
+    Return the ``ZipInfo`` for a file, when ``date_time`` is set the time-stamp & permissions
+    are normalized so the entry doesn't depend on the file-system.
+    """
+    zinfo = zipfile.ZipInfo.from_file(filepath_abs, filepath_rel)
+    if date_time is not None:
+        zinfo.date_time = date_time
+        # UNIX, so the permissions are used on all platforms.
+        zinfo.create_system = 3
+        mode = 0o755 if ((zinfo.external_attr >> 16) & 0o111) else 0o644
+        zinfo.external_attr = (stat.S_IFREG | mode) << 16
+    return zinfo
+
+
+def zipfile_info_compresslevel_set(zinfo: zipfile.ZipInfo, compresslevel: int) -> None:
+    """
+    Set the compression level used when writing ``zinfo`` with ``ZipFile.open``.
+    """
+    # NOTE: public since Python 3.13 (`compress_level`), older versions only support the private attribute.
+    if hasattr(zinfo, "compress_level"):
+        zinfo.compress_level = compresslevel
+    else:
+        setattr(zinfo, "_compresslevel", compresslevel)
+
+
+def zipfile_write_from_filepath(
+        zip_fh: zipfile.ZipFile,
+        filepath_abs: str,
+        filepath_rel: str,
+        *,
+        compress_type: int,
+        compresslevel: int,
+        date_time: tuple[int, int, int, int, int, int] | None,
+) -> None:
+    """
+    Write a file, matching ``ZipFile.write`` besides the handling of ``date_time``.
+    """
+    zinfo = zipfile_info_from_file(filepath_abs, filepath_rel, date_time)
+    zinfo.compress_type = compress_type
+    zipfile_info_compresslevel_set(zinfo, compresslevel)
+    with open(filepath_abs, "rb") as fh_src, zip_fh.open(zinfo, "w") as fh_dst:
+        shutil.copyfileobj(fh_src, fh_dst, CHUNK_SIZE_MAX)
+
+
+# -----------------------------------------------------------------------------
+# Incremental Build
+
+def zipfile_write_raw(
+        zip_fh: zipfile.ZipFile,
+        zinfo: zipfile.ZipInfo,
+        data_iter: Iterator[bytes],
+) -> None:
+    """
+    Write an entry which has already been compressed,
+    ``zinfo`` must have its CRC & sizes set to match the data.
+    """
+    # NOTE: there is no public API for this, follow the logic of `ZipFile.write` for a seekable file.
+    # Only archives opened for writing are supported, as these always write the central directory on closing
+    # (appending would require the archive to be marked as modified).
+    assert zip_fh.mode in {"w", "x"}
+    fh = zip_fh.fp
+    assert fh is not None
+    # The sizes are written in the header, a data descriptor isn't needed.
+    zinfo.flag_bits &= ~0x08
+    zinfo.header_offset = fh.tell()
+    # Match `ZipFile.open` so the header is identical to the header of an entry written by `ZipFile.write`.
+    fh.write(zinfo.FileHeader(
+        (zinfo.file_size * 1.05 > zipfile.ZIP64_LIMIT) or (zinfo.compress_size > zipfile.ZIP64_LIMIT)
+    ))
+    for data in data_iter:
+        fh.write(data)
+
+    zip_fh.filelist.append(zinfo)
+    zip_fh.NameToInfo[zinfo.filename] = zinfo
+    zip_fh.start_dir = fh.tell()
+
+
+def zipfile_write_raw_from_zipfile(
+        zip_fh: zipfile.ZipFile,
+        zip_fh_src: zipfile.ZipFile,
+        zinfo_src: zipfile.ZipInfo,
+        zinfo: zipfile.ZipInfo,
+) -> None:
+    """
+    Copy the compressed data of ``zinfo_src`` from ``zip_fh_src`` into ``zip_fh`` without decompressing
+    & re-compressing it. Other attributes (the time-stamp & permissions for e.g.) are taken from ``zinfo``,
+    so they match the file being archived, instead of the file which was previously archived.
+    """
+    fh_src = zip_fh_src.fp
+    assert fh_src is not None
+    fh_src.seek(zinfo_src.header_offset)
+    header = fh_src.read(ZIP_LOCAL_FILE_HEADER_SIZE)
+    if len(header) != ZIP_LOCAL_FILE_HEADER_SIZE or header[:4] != ZIP_LOCAL_FILE_HEADER_SIGNATURE:
+        raise zipfile.BadZipFile("Bad local file header for \"{:s}\"".format(zinfo_src.filename))
+    # Skip the file name & extra field which follow the local file header.
+    fh_src.seek(int.from_bytes(header[26:28], "little") + int.from_bytes(header[28:30], "little"), os.SEEK_CUR)
+
+    def data_iter() -> Iterator[bytes]:
+        size_remaining = zinfo_src.compress_size
+        while size_remaining:
+            data = fh_src.read(min(size_remaining, CHUNK_SIZE_MAX))
+            if not data:
+                raise zipfile.BadZipFile("Truncated data for \"{:s}\"".format(zinfo_src.filename))
+            yield data
+            size_remaining -= len(data)
+
+    assert zinfo.filename == zinfo_src.filename
+    zinfo.compress_type = zinfo_src.compress_type
+    zinfo.CRC = zinfo_src.CRC
+    zinfo.compress_size = zinfo_src.compress_size
+    zinfo.file_size = zinfo_src.file_size
+
+    zipfile_write_raw(zip_fh, zinfo, data_iter())
+
+
+def zipfile_deflate_from_filepath(filepath: str, compresslevel: int) -> tuple[int, int, bytes]:
+    """
+    Return the CRC32, size & deflated data of ``filepath``, matching the data written by ``ZipFile.write``.
+    Intended to be called from a thread (``zlib`` releases the GIL while compressing).
+    """
+    compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, -15)
+    crc = 0
+    size = 0
+    chunks = []
+    with open(filepath, "rb") as fh:
+        while data := fh.read(CHUNK_SIZE_MAX):
+            crc = zlib.crc32(data, crc)
+            size += len(data)
+            chunks.append(compressor.compress(data))
+    chunks.append(compressor.flush())
+    return crc, size, b"".join(chunks)
+
+
+def zipfile_write_deflated(
+        zip_fh: zipfile.ZipFile,
+        filepath_abs: str,
+        filepath_rel: str,
+        deflate_result: tuple[int, int, bytes],
+        date_time: tuple[int, int, int, int, int, int] | None,
+) -> None:
+    """
+    Write the result of ``zipfile_deflate_from_filepath``.
+    """
+    crc, size, data = deflate_result
+    zinfo = zipfile_info_from_file(filepath_abs, filepath_rel, date_time)
+    zinfo.compress_type = zipfile.ZIP_DEFLATED
+    zinfo.CRC = crc
+    zinfo.file_size = size
+    zinfo.compress_size = len(data)
+    zipfile_write_raw(zip_fh, zinfo, iter((data,)))
+
+
+class BuildCacheIncremental:
+    """
+    Reuse compressed entries from the previous build of an archive when the input files are unchanged.
+
+    The cache stores the size, modification time, hash, compression level & permissions of each input file
+    along with the size & modification time of the archive it describes,
+    so the cache is ignored when the archive was replaced or modified.
+    The cache is also ignored when the time-stamp used for reproducible builds changes.
+    """
+    __slots__ = (
+        "_date_time",
+        "_hashes",
+        "_files_prev",
+        "_files",
+        "_zip_fh_prev",
+        "reused",
+    )
+
+    def __init__(
+            self,
+            *,
+            date_time: tuple[int, int, int, int, int, int] | None,
+            hashes: dict[str, tuple[int, int, str]],
+    ) -> None:
+        self._date_time = date_time
+        # `{filepath_abs: (size, mtime_ns, sha256)}`, shared between the archives of each platform
+        # so files included in multiple archives are only hashed once.
+        self._hashes = hashes
+        # `{filepath_rel: (size, mtime_ns, sha256, compresslevel, mode)}`
+        self._files_prev: dict[str, tuple[int, int, str, int, int]] = {}
+        self._files: dict[str, tuple[int, int, str, int, int]] = {}
+        self._zip_fh_prev: zipfile.ZipFile | None = None
+        self.reused = 0
+
+    @staticmethod
+    def _filepath_from_archive(filepath_archive: str) -> str:
+        dirpath, filename = os.path.split(filepath_archive)
+        return os.path.join(dirpath, "." + filename + BUILD_CACHE_EXT)
+
+    def _sha256_from_file_or_none(self, filepath_abs: str, st: os.stat_result) -> str | None:
+        if (
+                ((value := self._hashes.get(filepath_abs)) is not None) and
+                (value[0] == st.st_size and value[1] == st.st_mtime_ns)
+        ):
+            return value[2]
+        if isinstance(result := sha256_from_file_or_error(filepath_abs), str):
+            return None
+        self._hashes[filepath_abs] = (st.st_size, st.st_mtime_ns, result[1])
+        return result[1]
+
+    def load(self, filepath_archive: str) -> None:
+        """
+        Load the cache for the previous build of ``filepath_archive``, a missing or invalid cache is ignored.
+        """
+        try:
+            with open(self._filepath_from_archive(filepath_archive), "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+            st = os.stat(filepath_archive)
+            if (
+                    data["version"] != 2 or
+                    data["archive"] != [st.st_size, st.st_mtime_ns] or
+                    data["date_time"] != (None if self._date_time is None else list(self._date_time))
+            ):
+                return
+            files_prev = {
+                filepath_rel: (size, mtime_ns, sha256, compresslevel, mode)
+                for filepath_rel, (size, mtime_ns, sha256, compresslevel, mode) in data["files"].items()
+            }
+            # pylint: disable-next=consider-using-with
+            self._zip_fh_prev = zipfile.ZipFile(filepath_archive, mode="r")
+        except Exception:
+            return
+        self._files_prev = files_prev
+
+    def find_previous(
+            self,
+            filepath_abs: str,
+            filepath_rel: str,
+            compress_type: int,
+            compresslevel: int,
+    ) -> zipfile.ZipInfo | None:
+        """
+        Return the entry for ``filepath_rel`` from the previous archive or None when it can't be reused.
+        The entry must be written using ``write_previous``.
+        """
+        if self._zip_fh_prev is None:
+            return None
+        if (file_prev := self._files_prev.get(filepath_rel)) is None:
+            return None
+        if (zinfo_prev := self._zip_fh_prev.NameToInfo.get(filepath_rel)) is None:
+            return None
+        if zinfo_prev.compress_type != compress_type:
+            return None
+        if compress_type != zipfile.ZIP_STORED and file_prev[3] != compresslevel:
+            return None
+
+        try:
+            st = os.stat(filepath_abs)
+        except OSError:
+            return None
+        if st.st_size != file_prev[0]:
+            return None
+        if stat.S_IMODE(st.st_mode) != file_prev[4]:
+            return None
+        if st.st_mtime_ns != file_prev[1]:
+            # The time changed, the contents may not have.
+            if self._sha256_from_file_or_none(filepath_abs, st) != file_prev[2]:
+                return None
+
+        self._files[filepath_rel] = (st.st_size, st.st_mtime_ns, file_prev[2], compresslevel, stat.S_IMODE(st.st_mode))
+        return zinfo_prev
+
+    def write_previous(
+            self,
+            zip_fh: zipfile.ZipFile,
+            zinfo_prev: zipfile.ZipInfo,
+            filepath_abs: str,
+            filepath_rel: str,
+    ) -> None:
+        assert self._zip_fh_prev is not None
+        zipfile_write_raw_from_zipfile(
+            zip_fh,
+            self._zip_fh_prev,
+            zinfo_prev,
+            zipfile_info_from_file(filepath_abs, filepath_rel, self._date_time),
+        )
+        self.reused += 1
+
+    def add(self, filepath_abs: str, filepath_rel: str, compresslevel: int) -> None:
+        """
+        Add a file written to the archive so it can be reused by the next build.
+        """
+        st = os.stat(filepath_abs)
+        if (sha256 := self._sha256_from_file_or_none(filepath_abs, st)) is None:
+            return
+        self._files[filepath_rel] = (st.st_size, st.st_mtime_ns, sha256, compresslevel, stat.S_IMODE(st.st_mode))
+
+    def close(self) -> None:
+        if self._zip_fh_prev is not None:
+            self._zip_fh_prev.close()
+            self._zip_fh_prev = None
+
+    def write(self, filepath_archive: str) -> None:
+        st = os.stat(filepath_archive)
+        filepath = self._filepath_from_archive(filepath_archive)
+        with open(filepath + "@", "w", encoding="utf-8") as fh:
+            json.dump({
+                "version": 2,
+                "archive": [st.st_size, st.st_mtime_ns],
+                "date_time": None if self._date_time is None else list(self._date_time),
+                "files": {filepath_rel: list(value) for filepath_rel, value in self._files.items()},
+            }, fh, indent=0)
+        os.replace(filepath + "@", filepath)
+
+
+# -----------------------------------------------------------------------------
+# Generate Argument Handlers
+
+def arg_handle_int_as_bool(value: str) -> bool:
+    result = int(value)
+    if result not in {0, 1}:
+        raise argparse.ArgumentTypeError("Expected a 0 or 1")
+    return bool(result)
+
+
+def arg_handle_str_as_package_names(value: str) -> Sequence[str]:
+    result = value.split(",")
+    for pkg_idname in result:
+        if (error_msg := pkg_idname_is_valid_or_error(pkg_idname)) is not None:
+            raise argparse.ArgumentTypeError("Invalid name \"{:s}\". {:s}".format(pkg_idname, error_msg))
+    return result
+
+
+def arg_handle_int_as_jobs(value: str) -> int:
+    result = int(value)
+    if result < 1:
+        raise argparse.ArgumentTypeError("Expected a value of 1 or more")
+    return result
+
+
+def arg_handle_str_as_size(value: str) -> int:
+    value_upper = value.strip().upper()
+    scale = 1
+    for suffix, suffix_scale in (("K", 1 << 10), ("M", 1 << 20), ("G", 1 << 30)):
+        if value_upper.endswith(suffix):
+            value_upper = value_upper[:-1]
+            scale = suffix_scale
+            break
+    try:
+        result = int(value_upper) * scale
+    except ValueError as ex:
+        raise argparse.ArgumentTypeError(str(ex)) from ex
+    if result < 0:
+        raise argparse.ArgumentTypeError("Expected a positive value")
+    return result
+
+
+def arg_handle_str_as_transfer_stall(value: str) -> tuple[int, float]:
+    size_str, sep, seconds_str = value.partition("/")
+    if not sep:
+        raise argparse.ArgumentTypeError("Must be in the form \"BYTES/SECONDS\"")
+    try:
+        size = int(size_str)
+        seconds = float(seconds_str)
+    except ValueError as ex:
+        raise argparse.ArgumentTypeError(str(ex)) from ex
+    if size < 0 or seconds < 0.0:
+        raise argparse.ArgumentTypeError("Expected positive values")
+    return size, seconds
+
+
+def arg_handle_str_as_temp_prefix_and_suffix(value: str) -> tuple[str, str]:
+    if (value.count("/") != 1) and (len(value) > 1):
+        raise argparse.ArgumentTypeError("Must contain a \"/\" character with a prefix and/or suffix")
+    a, b = value.split("/", 1)
+    return a, b
+
+
+# -----------------------------------------------------------------------------
+# Argument Handlers ("build" command)
+
+def generic_arg_build_split_platforms(subparse: argparse.ArgumentParser) -> None:
+    subparse.add_argument(
+        "--split-platforms",
+        dest="split_platforms",
+        action="store_true",
+        default=False,
+        help=(
+            "Build a separate package for each platform.\n"
+            "Adding the platform as a file name suffix (before the extension).\n"
+            "\n"
+            "This can be useful to reduce the upload size of packages that bundle large\n"
+            "platform-specific modules (``*.whl`` files)."
+        ),
+    )
+
+
+def generic_arg_build_incremental(subparse: argparse.ArgumentParser) -> None:
+    subparse.add_argument(
+        "--incremental",
+        dest="incremental",
+        action="store_true",
+        default=False,
+        help=(
+            "Reuse compressed files from the previous build of the package when they are unchanged.\n"
+            "A cache is stored next to the package (as a hidden file)."
+        ),
+    )
+
+
+def generic_arg_build_reproducible(subparse: argparse.ArgumentParser) -> None:
+    subparse.add_argument(
+        "--reproducible",
+        dest="reproducible",
+        action="store_true",
+        default=False,
+        help=(
+            "Build a package which only depends on the contents of the files,\n"
+            "sorting files by name & normalizing time-stamps & permissions.\n"
+            "The time-stamp is read from the \"SOURCE_DATE_EPOCH\" environment variable when set."
+        ),
+    )
+
+
+def generic_arg_build_batch(subparse: argparse.ArgumentParser) -> None:
+    subparse.add_argument(
+        "--source-dirs",
+        dest="source_dirs",
+        nargs="+",
+        default=[],
+        metavar="SOURCE_DIR",
+        help=(
+            "Build multiple packages, each directory containing a ``{:s}`` manifest.\n"
+            "Packages are written to the output directory."
+        ).format(PKG_MANIFEST_FILENAME_TOML),
+    )
+    subparse.add_argument(
+        "--workspace",
+        dest="workspace_filepath",
+        default="",
+        metavar="FILEPATH",
+        help=(
+            "Build multiple packages, from a text file listing package source directories one per line\n"
+            "(relative to the file), blank lines & lines starting with a \"#\" are ignored.\n"
+            "May be combined with \"--source-dirs\"."
+        ),
+    )
+    subparse.add_argument(
+        "--batch-jobs",
+        dest="batch_jobs",
+        type=arg_handle_int_as_jobs,
+        default=min(4, os.cpu_count() or 1),
+        help=(
+            "The maximum number of processes used to build packages in parallel\n"
+            "(when building multiple packages)."
+        ),
+    )
+
+
+def generic_arg_build_jobs(subparse: argparse.ArgumentParser) -> None:
+    subparse.add_argument(
+        "--jobs",
+        dest="build_jobs",
+        type=arg_handle_int_as_jobs,
+        default=1,
+        help=(
+            "The number of threads used to scan directories & compress files (the resulting package is identical)."
+        ),
+    )
+
+
+def generic_arg_package_valid_tags(subparse: argparse.ArgumentParser) -> None:
+    # NOTE(@ideasman42): when called from Blender tags for `extensions.blender.org` are enforced by default.
+    # For `extensions.blender.org` this is enforced on the server side, so it's better developers see the error
+    # on build/validate instead of uploading the package.
+    # It's worth noting not all extensions will be hosted on `extensions.blender.org`,
+    # 3rd party hosting should remain a first class citizen not some exceptional case.
+    #
+    # The rationale for applying these tags for all packages even accepting that not everyone is targeting
+    # Blender's official repository is to avoid every extension defining their own tags.
+    #
+    # This has two down sides:
+    # - Duplicate similar tags, e.g. `"render", "rendering"`, `"toon", "cartoon"` etc.
+    # - Tag proliferation (100's of tags), makes the UI unusable.
+    #   So even when all tags are valid and named well, having everyone defining
+    #   their own tags results the user having to filter between too many options.
+    #   Although a re-designed UI could account for this if it were important.
+    #
+    # Nevertheless, allow motivated developers to ignore the tags limitations as it's somewhat arbitrarily.
+    # The default to apply these limits is a "nudge" to avoid additional tags from typos as well as a hint
+    # that tags should be added to Blender's list if they're needed instead of being defined ad-hoc.
+
+    subparse.add_argument(
+        "--valid-tags",
+        dest="valid_tags_filepath",
+        default=ARG_DEFAULTS_OVERRIDE.build_valid_tags,
+        metavar="VALID_TAGS_JSON",
+        # NOTE(@ideasman42): Python input is also supported, intentionally undocumented for now,
+        # since this is only supported as Blender's tags happen to be stored as a Python script - which may change.
+        help=(
+            "Reference a file path containing valid tags lists.\n"
+            "\n"
+            "If you wish to reference custom tags a ``.json`` file can be used.\n"
+            "The contents must be a dictionary of lists where the ``key`` matches the extension type.\n"
+            "\n"
+            "For example:\n"
+            "   ``{\"add-ons\": [\"Example\", \"Another\"], \"theme\": [\"Other\", \"Tags\"]}``\n"
+            "\n"
+            "To disable validating tags, pass in an empty path ``--valid-tags=\"\"``."
+        ),
+    )
+
+
+# -----------------------------------------------------------------------------
+# Argument Handlers ("server-generate" command)
 
 def generic_arg_server_generate_repo_config(subparse: argparse.ArgumentParser) -> None:
     subparse.add_argument(
@@ -3259,6 +5555,19 @@ def generic_arg_server_generate_html(subparse: argparse.ArgumentParser) -> None:
     )
 
 
+def generic_arg_server_generate_hash_cache(subparse: argparse.ArgumentParser) -> None:
+    subparse.add_argument(
+        "--hash-cache",
+        dest="hash_cache",
+        action="store_true",
+        default=False,
+        help=(
+            "Store the hash of each package in a file next to it (with a \"{:s}\" extension),\n"
+            "used when generating the listing again if the package is unchanged."
+        ).format(SHA256_SIDECAR_EXT),
+    )
+
+
 def generic_arg_server_generate_html_template(subparse: argparse.ArgumentParser) -> None:
     subparse.add_argument(
         "--html-template",
@@ -3424,7 +5733,8 @@ def generic_arg_package_source_dir(subparse: argparse.ArgumentParser) -> None:
     subparse.add_argument(
         "--source-dir",
         dest="source_dir",
-        default=".",
+        # None when unset, so an explicit current directory can be combined with other source directories.
+        default=None,
         type=str,
         help=(
             "The package source directory containing a ``{:s}`` manifest.\n"
@@ -3493,6 +5803,124 @@ def generic_arg_local_cache(subparse: argparse.ArgumentParser) -> None:
     )
 
 
+def generic_arg_download_jobs(subparse: argparse.ArgumentParser) -> None:
+    subparse.add_argument(
+        "--download-jobs",
+        dest="download_jobs",
+        type=arg_handle_int_as_jobs,
+        help=(
+            "The maximum number of packages to download at once."
+        ),
+        default=4,
+        required=False,
+    )
+
+
+def generic_arg_extract_jobs(subparse: argparse.ArgumentParser) -> None:
+    subparse.add_argument(
+        "--extract-jobs",
+        dest="extract_jobs",
+        type=arg_handle_int_as_jobs,
+        help=(
+            "The maximum number of threads used to extract each package."
+        ),
+        default=min(4, os.cpu_count() or 1),
+        required=False,
+    )
+
+
+def generic_arg_wheel_store(subparse: argparse.ArgumentParser) -> None:
+    subparse.add_argument(
+        "--wheel-store",
+        dest="wheel_store",
+        type=arg_handle_int_as_bool,
+        help=(
+            "Store bundled wheels once per repository (by their hash), hard-linking them into extensions.\n"
+            "Reduces disk usage when extensions bundle the same wheels."
+        ),
+        default=False,
+        required=False,
+    )
+
+
+def generic_arg_delta_upgrade(subparse: argparse.ArgumentParser) -> None:
+    subparse.add_argument(
+        "--delta-upgrade",
+        dest="delta_upgrade",
+        type=arg_handle_int_as_bool,
+        help=(
+            "When the package is already installed, only write the files which changed since it was installed.\n"
+            "Files which aren't part of the package (such as Python's cache) are kept."
+        ),
+        default=False,
+        required=False,
+    )
+
+
+def generic_arg_defer_removal(subparse: argparse.ArgumentParser) -> None:
+    subparse.add_argument(
+        "--defer-removal",
+        dest="defer_removal",
+        type=arg_handle_int_as_bool,
+        help=(
+            "Leave replaced or removed directories once they have been renamed,\n"
+            "so they can be removed later by the \"gc\" command."
+        ),
+        default=False,
+        required=False,
+    )
+
+
+def generic_arg_compile_bytecode(subparse: argparse.ArgumentParser) -> None:
+    subparse.add_argument(
+        "--compile-bytecode",
+        dest="compile_bytecode",
+        type=arg_handle_int_as_bool,
+        help=(
+            "Compile the Python files of installed packages to bytecode,\n"
+            "so they don't need to be compiled when first imported.\n"
+            "Only supported when \"--python-version\" matches the Python version running this command."
+        ),
+        default=False,
+        required=False,
+    )
+    subparse.add_argument(
+        "--compile-jobs",
+        dest="compile_jobs",
+        type=arg_handle_int_as_jobs,
+        help=(
+            "The maximum number of processes used to compile bytecode."
+        ),
+        default=os.cpu_count() or 1,
+        required=False,
+    )
+
+
+def generic_arg_global_cache(subparse: argparse.ArgumentParser) -> None:
+    subparse.add_argument(
+        "--global-cache-dir",
+        dest="global_cache_dir",
+        type=str,
+        help=(
+            "A directory to cache archives in, shared between repositories.\n"
+            "Archives found in this cache are never downloaded again."
+        ),
+        default="",
+        required=False,
+    )
+    subparse.add_argument(
+        "--global-cache-size",
+        dest="global_cache_size",
+        type=arg_handle_str_as_size,
+        help=(
+            "The size budget for \"--global-cache-dir\", the least recently used archives are removed\n"
+            "when it's exceeded. Sizes may use a K, M or G suffix, zero for no limit (the default)."
+        ),
+        default=0,
+        required=False,
+    )
+
+
 def generic_arg_online_user_agent(subparse: argparse.ArgumentParser) -> None:
     subparse.add_argument(
         "--online-user-agent",
@@ -3543,6 +5971,31 @@ def generic_arg_timeout(subparse: argparse.ArgumentParser) -> None:
     )
 
 
+def generic_arg_transfer_limits(subparse: argparse.ArgumentParser) -> None:
+    subparse.add_argument(
+        "--timeout-deadline",
+        dest="timeout_deadline",
+        type=float,
+        help=(
+            "The maximum time in seconds a single transfer may take (zero for no limit)."
+        ),
+        default=0.0,
+        required=False,
+    )
+    subparse.add_argument(
+        "--timeout-stall",
+        dest="timeout_stall",
+        type=arg_handle_str_as_transfer_stall,
+        help=(
+            "Fail a transfer when it stalls, in the form \"BYTES/SECONDS\".\n"
+            "For example \"1024/30\" fails when fewer than 1024 bytes are transferred in 30 seconds.\n"
+            "By default there is no limit."
+        ),
+        default=(0, 0.0),
+        required=False,
+    )
+
+
 def generic_arg_ignore_broken_pipe(subparse: argparse.ArgumentParser) -> None:
     subparse.add_argument(
         "--force-exit-ok",
@@ -3748,6 +6201,7 @@ class subcmd_server:
             repo_config_filepath: str,
             html: bool,
             html_template: str,
+            hash_cache: bool,
     ) -> bool:
         if url_has_known_prefix(repo_dir):
             msglog.fatal_error("Directory: {!r} must be a local path, not a URL!".format(repo_dir))
@@ -3859,11 +6313,14 @@ class subcmd_server:
             manifest_dict["archive_url"] = "./" + urllib.request.pathname2url(filename)
 
             # Add archive variables, see: `PkgManifest_Archive`.
-            if isinstance((result := sha256_from_file_or_error(filepath, hash_prefix=True)), str):
-                msglog.error("unable to calculate hash ({:s}): {:s}".format(result, filepath))
+            if isinstance((size_and_hash := (
+                    sha256_from_file_with_sidecar_or_error(filepath) if hash_cache else
+                    sha256_from_file_or_error(filepath, hash_prefix=True)
+            )), str):
+                msglog.error("unable to calculate hash ({:s}): {:s}".format(size_and_hash, filepath))
                 continue
-            manifest_dict["archive_size"], manifest_dict["archive_hash"] = result
-            del result
+            manifest_dict["archive_size"], manifest_dict["archive_hash"] = size_and_hash
+            del size_and_hash
 
             repo_data.append(manifest_dict)
 
@@ -3915,6 +6372,7 @@ class subcmd_client:
             online_user_agent: str,
             access_token: str,
             timeout_in_seconds: float,
+            transfer_limits: TransferLimits,
             demote_connection_errors_to_status: bool,
     ) -> bool:
 
@@ -3937,6 +6395,7 @@ class subcmd_client:
                     ),
                     chunk_size=CHUNK_SIZE_DEFAULT,
                     timeout_in_seconds=timeout_in_seconds,
+                    transfer_limits=transfer_limits,
                     retrieve_info=DataRetrieveInfo(),  # Unused.
             ):
                 result.write(block)
@@ -3986,6 +6445,7 @@ class subcmd_client:
             online_user_agent: str,
             access_token: str,
             timeout_in_seconds: float,
+            transfer_limits: TransferLimits,
             demote_connection_errors_to_status: bool,
             force_exit_ok: bool,
             extension_override: str,
@@ -4001,6 +6461,7 @@ class subcmd_client:
             online_user_agent=online_user_agent,
             access_token=access_token,
             timeout_in_seconds=timeout_in_seconds,
+            transfer_limits=transfer_limits,
             demote_connection_errors_to_status=demote_connection_errors_to_status,
             extension_override=extension_override,
         )
@@ -4016,6 +6477,11 @@ class subcmd_client:
             python_version_tuple: tuple[int, int, int],
             manifest_compare: PkgManifest | None,
             temp_prefix_and_suffix: tuple[str, str],
+            extract_jobs: int,
+            wheel_store_dir: str,
+            delta_upgrade: bool,
+            reaper: RemovalReaper,
+            bytecode_compiler: BytecodeCompiler | None,
     ) -> bool:
         # NOTE: Don't use `FATAL_ERROR` because other packages will attempt to install.
 
@@ -4102,9 +6568,66 @@ class subcmd_client:
                     zipfile_make_root_directory(zip_fh, archive_subdir)
                 del archive_subdir
 
+                # Roll back an upgrade which didn't complete.
+                if (error := pkg_delta_journal_rollback_or_error(filepath_local_pkg)) is not None:
+                    msglog.error("Failed to roll back incomplete upgrade for \"{:s}\": {:s}".format(manifest.id, error))
+                    return False
+
+                members = zip_fh.infolist()
+                # Archives which aren't built for a single platform include wheels for all platforms.
+                if manifest.wheels:
+                    members = pkg_zipfile_members_filter_wheels_by_platform(
+                        members,
+                        manifest.wheels,
+                        platform_from_this_system(),
+                    )
+
+                record_new = pkg_record_from_members(members)
+
+                if (
+                        delta_upgrade and
+                        (record_new is not None) and
+                        os.path.isdir(filepath_local_pkg) and
+                        ((record_old := pkg_record_read_or_none(filepath_local_pkg)) is not None)
+                ):
+                    try:
+                        result = pkg_delta_upgrade_or_error(
+                            zip_fh,
+                            members,
+                            filepath_archive,
+                            filepath_local_pkg,
+                            filepath_local_pkg_temp,
+                            record_old=record_old,
+                            record_new=record_new,
+                            extract_jobs=extract_jobs,
+                            wheel_store_dir=wheel_store_dir,
+                        )
+                    except Exception as ex:
+                        result = str(ex)
+                    if isinstance(result, str):
+                        msglog.error("Failed to upgrade files for \"{:s}\": {:s}".format(manifest.id, result))
+                        return False
+                    msglog.status("Reinstalled \"{:s}\" ({:d} changed, {:d} removed)".format(manifest.id, *result))
+                    if bytecode_compiler is not None:
+                        subcmd_client._install_package_compile_bytecode(
+                            msglog,
+                            pkg_id=manifest.id,
+                            filepath_local_pkg=filepath_local_pkg,
+                            bytecode_compiler=bytecode_compiler,
+                        )
+                    return True
+
                 try:
-                    for member in zip_fh.infolist():
-                        zip_fh.extract(member, filepath_local_pkg_temp)
+                    zipfile_extract_members_for_install(
+                        zip_fh,
+                        members,
+                        filepath_archive,
+                        filepath_local_pkg_temp,
+                        extract_jobs=extract_jobs,
+                        wheel_store_dir=wheel_store_dir,
+                    )
+                    if record_new is not None:
+                        pkg_record_write(filepath_local_pkg_temp, record_new)
                 except Exception as ex:
                     msglog.error("Failed to extract files for \"{:s}\": {:s}".format(manifest.id, str(ex)))
                     return False
@@ -4118,6 +6641,7 @@ class subcmd_client:
                 if (error := rmtree_with_fallback_or_error_pseudo_atomic(
                         filepath_local_pkg,
                         temp_prefix_and_suffix=temp_prefix_and_suffix,
+                        reaper=reaper,
                 )) is not None:
                     if os.path.lexists(filepath_local_pkg):
                         msglog.error("Failed to remove or relocate existing directory for \"{:s}\": {:s}".format(
@@ -4155,8 +6679,43 @@ class subcmd_client:
         else:
             msglog.status("Installed \"{:s}\"".format(manifest.id))
 
+        if bytecode_compiler is not None:
+            subcmd_client._install_package_compile_bytecode(
+                msglog,
+                pkg_id=manifest.id,
+                filepath_local_pkg=filepath_local_pkg,
+                bytecode_compiler=bytecode_compiler,
+            )
+
         return True
 
+    @staticmethod
+    def _install_package_compile_bytecode(
+            msglog: MessageLogger,
+            *,
+            pkg_id: str,
+            filepath_local_pkg: str,
+            bytecode_compiler: BytecodeCompiler,
+    ) -> None:
+        # Failing to compile doesn't prevent the package from being used, only warn.
+        time_start = time.monotonic()
+        try:
+            files_num, errors = bytecode_compiler.compile_dir(filepath_local_pkg)
+        except Exception as ex:
+            msglog.warn("Failed to compile bytecode for \"{:s}\": {:s}".format(pkg_id, str(ex)))
+            return
+
+        for filepath, error in errors:
+            msglog.warn("Failed to compile bytecode for \"{:s}\": {:s}".format(
+                os.path.relpath(filepath, filepath_local_pkg),
+                error,
+            ))
+        msglog.status("Compiled \"{:s}\" ({:d} files in {:.2f}s)".format(
+            pkg_id,
+            files_num,
+            time.monotonic() - time_start,
+        ))
+
     @staticmethod
     def install_packages_from_files(
             msglog: MessageLogger,
@@ -4166,11 +6725,32 @@ class subcmd_client:
             blender_version: str,
             python_version: str,
             temp_prefix_and_suffix: tuple[str, str],
+            extract_jobs: int,
+            wheel_store: bool,
+            delta_upgrade: bool,
+            defer_removal: bool,
+            compile_bytecode: bool,
+            compile_jobs: int,
     ) -> bool:
         if not os.path.exists(local_dir):
             msglog.fatal_error("destination directory \"{:s}\" does not exist".format(local_dir))
             return False
 
+        wheel_store_dir = ""
+        if wheel_store:
+            if (wheel_store_dir_or_none := repo_local_private_dir_ensure_with_subdir(
+                    local_dir=local_dir,
+                    subdir="wheels",
+                    error_fn=lambda ex: any_as_none(
+                        msglog.fatal_error("Error creating wheel store directory: {:s}".format(str(ex)))
+                    ),
+            )) is None:
+                return False
+            if (error := wheel_store_link_test_or_error(wheel_store_dir_or_none, local_dir)) is not None:
+                msglog.warn("Wheel store disabled, hard-links aren't supported ({:s})".format(error))
+            else:
+                wheel_store_dir = wheel_store_dir_or_none
+
         if isinstance(blender_version_tuple := blender_version_parse_or_error(blender_version), str):
             msglog.fatal_error(blender_version_tuple)
             return False
@@ -4181,22 +6761,292 @@ class subcmd_client:
             return False
         assert isinstance(python_version_tuple, tuple)
 
+        if compile_bytecode and (error := bytecode_compile_python_version_or_error(python_version_tuple)) is not None:
+            msglog.warn("Skipping bytecode compilation: {:s}".format(error))
+            compile_bytecode = False
+
         # This is a simple file extraction, the main difference is that it validates the manifest before installing.
-        directories_to_clean: list[str] = []
-        with CleanupPathsContext(files=(), directories=directories_to_clean):
-            for filepath_archive in package_files:
-                if not subcmd_client._install_package_from_file_impl(
-                        msglog,
-                        local_dir=local_dir,
-                        filepath_archive=filepath_archive,
-                        blender_version_tuple=blender_version_tuple,
-                        python_version_tuple=python_version_tuple,
-                        # There is no manifest from the repository, leave this unset.
-                        manifest_compare=None,
-                        temp_prefix_and_suffix=temp_prefix_and_suffix,
+        with (
+                RemovalReaper(defer=defer_removal) as reaper,
+                BytecodeCompiler(jobs=compile_jobs) as bytecode_compiler,
+        ):
+            directories_to_clean: list[str] = []
+            with CleanupPathsContext(files=(), directories=directories_to_clean):
+                for filepath_archive in package_files:
+                    if not subcmd_client._install_package_from_file_impl(
+                            msglog,
+                            local_dir=local_dir,
+                            filepath_archive=filepath_archive,
+                            blender_version_tuple=blender_version_tuple,
+                            python_version_tuple=python_version_tuple,
+                            # There is no manifest from the repository, leave this unset.
+                            manifest_compare=None,
+                            temp_prefix_and_suffix=temp_prefix_and_suffix,
+                            extract_jobs=extract_jobs,
+                            wheel_store_dir=wheel_store_dir,
+                            delta_upgrade=delta_upgrade,
+                            reaper=reaper,
+                            bytecode_compiler=bytecode_compiler if compile_bytecode else None,
+                    ):
+                        # The package failed to install.
+                        continue
+
+        if wheel_store_dir:
+            # Wheels from replaced packages may no longer be used.
+            wheel_store_remove_unused(wheel_store_dir)
+
+        return True
+
+    @staticmethod
+    def _install_package_download_impl(
+            *,
+            filepath_remote_archive: str,
+            filepath_local_cache_archive: str,
+            archive_size_expected: int,
+            archive_hash_expected: str,
+            pkg_idname: str,
+            headers: dict[str, str],
+            timeout_in_seconds: float,
+            transfer_limits: TransferLimits,
+            download_state: "PkgDownloadState",
+            cancel_event: threading.Event,
+    ) -> str | None:
+        """
+        Download an archive into the cache, verifying its size & hash.
+        Return an error message on failure.
+
+        Data is written to a partial file first which is kept when the download is interrupted,
+        so the next attempt can resume where this one left off.
+
+        NOTE: this may run in a thread, so it must not use the message logger.
+        """
+        filepath_partial = pkg_archive_partial_filepath(
+            filepath_local_cache_archive,
+            archive_size_expected,
+            archive_hash_expected,
+        )
+
+        def retrieve_to_partial(offset: int) -> "hashlib._Hash | None":
+            # Return the hash of the partial file or None when canceled.
+            sha256 = hashlib.new('sha256')
+            retrieve_info = DataRetrieveInfo()
+            download_state.size_done = 0
+            # NOTE: separate calls so the type of the file is known to support reading.
+            with (open(filepath_partial, "r+b") if offset else open(filepath_partial, "w+b")) as fh_partial:
+                return retrieve_to_partial_impl(fh_partial, sha256, retrieve_info, offset)
+
+        def retrieve_to_partial_impl(
+                fh_partial: io.BufferedIOBase,
+                sha256: "hashlib._Hash",
+                retrieve_info: DataRetrieveInfo,
+                offset: int,
+        ) -> "hashlib._Hash | None":
+            if offset:
+                # Re-hash the existing data, it's not known to be valid until the hash of the whole file matches.
+                for block_partial in readinto_iter(
+                        fh_partial,
+                        chunk_size=CHUNK_SIZE_MAX,
+                        timeout_in_seconds=0.0,
+                        transfer_monitor=TransferMonitor(TRANSFER_LIMITS_NONE),
                 ):
-                    # The package failed to install.
-                    continue
+                    if cancel_event.is_set():
+                        return None
+                    sha256.update(block_partial)
+                    download_state.size_done += len(block_partial)
+                offset = download_state.size_done
+
+                if offset == archive_size_expected:
+                    # The partial file is complete (the process may have exited before it was renamed).
+                    if "sha256:" + sha256.hexdigest() == archive_hash_expected:
+                        return sha256
+                    # Invalid data, start over.
+                    sha256 = hashlib.new('sha256')
+                    download_state.size_done = offset = 0
+                    fh_partial.seek(0)
+                    fh_partial.truncate()
+
+            blocks_iter = url_retrieve_to_data_iter_or_filesystem(
+                filepath_remote_archive,
+                headers=headers,
+                chunk_size=CHUNK_SIZE_DEFAULT,
+                timeout_in_seconds=timeout_in_seconds,
+                transfer_limits=transfer_limits,
+                retrieve_info=retrieve_info,
+                offset=offset,
+            )
+            # The first block is empty, once read the offset the data starts from is known.
+            next(blocks_iter, b"")
+            if retrieve_info.offset != offset:
+                if retrieve_info.offset != 0:
+                    raise urllib.error.URLError("unexpected range start {:d}, expected {:d}".format(
+                        retrieve_info.offset,
+                        offset,
+                    ))
+                # The server ignored the range request, download the whole file.
+                sha256 = hashlib.new('sha256')
+                download_state.size_done = 0
+                fh_partial.seek(0)
+                fh_partial.truncate()
+
+            # NOTE: space isn't reserved using `file_preallocate`, as the size of the partial file
+            # is the offset to resume from, which must remain valid when the process is terminated.
+            fh_partial.seek(download_state.size_done)
+            for block in blocks_iter:
+                if cancel_event.is_set():
+                    return None
+                fh_partial.write(block)
+                sha256.update(block)
+                download_state.size_done += len(block)
+            return sha256
+
+        offset = 0
+        try:
+            offset = os.path.getsize(filepath_partial)
+        except OSError:
+            pass
+        # A partial file which is larger than the archive can't be resumed.
+        # It will fail validation, so start over.
+        if offset > archive_size_expected:
+            offset = 0
+
+        # NOTE(@ideasman42): There is more logic in the try/except block than I'd like.
+        # Refactoring could be done to avoid that but it ends up making logic difficult to follow.
+        try:
+            try:
+                sha256 = retrieve_to_partial(offset)
+            except urllib.error.HTTPError as ex:
+                # The range can't be satisfied (the partial file is likely invalid), start over.
+                if not (offset and ex.code == 416):
+                    raise
+                sha256 = retrieve_to_partial(0)
+        except (Exception, KeyboardInterrupt) as ex:
+            # NOTE: don't support `demote_connection_errors_to_status` here because a connection
+            # failure on installing *is* an error by definition.
+            # Unlike querying information which might reasonably be skipped.
+            return url_retrieve_exception_as_message(ex, prefix="install", url=filepath_remote_archive)
+
+        if sha256 is None:
+            # Canceled, keep the partial file so it can be resumed.
+            return None
+
+        # Validate:
+        error = None
+        if download_state.size_done != archive_size_expected:
+            error = "Archive size mismatch \"{:s}\", expected {:d}, was {:d}".format(
+                pkg_idname,
+                archive_size_expected,
+                download_state.size_done,
+            )
+        elif (filename_archive_hash_test := "sha256:" + sha256.hexdigest()) != archive_hash_expected:
+            error = "Archive checksum mismatch \"{:s}\", expected {:s}, was {:s}".format(
+                pkg_idname,
+                archive_hash_expected,
+                filename_archive_hash_test,
+            )
+
+        try:
+            if error is not None:
+                # Never resume from invalid data.
+                os.unlink(filepath_partial)
+            else:
+                os.replace(filepath_partial, filepath_local_cache_archive)
+                sha256_sidecar_write(filepath_local_cache_archive, archive_hash_expected)
+        except OSError as ex:
+            if error is None:
+                error = "Error moving archive into the cache \"{:s}\": {:s}".format(pkg_idname, str(ex))
+
+        return error
+
+    @staticmethod
+    def _install_packages_download(
+            msglog: MessageLogger,
+            *,
+            local_cache_dir: str,
+            packages_to_download: Sequence[tuple[PkgManifest_Archive, str]],
+            packages_cached: Sequence[PkgManifest_Archive],
+            headers: dict[str, str],
+            timeout_in_seconds: float,
+            transfer_limits: TransferLimits,
+            download_jobs: int,
+            install_fn: Callable[[PkgManifest_Archive], None],
+    ) -> bool:
+        """
+        Download archives into the cache, up to ``download_jobs`` at once.
+        Progress is reported for all downloads combined.
+
+        ``install_fn`` is called from the main thread for each archive once it's been verified
+        (starting with ``packages_cached``), so installing overlaps with the remaining downloads.
+        """
+        import concurrent.futures
+
+        cancel_event = threading.Event()
+        download_states = [PkgDownloadState() for _ in packages_to_download]
+        size_total = sum(manifest_archive.archive_size for manifest_archive, _ in packages_to_download)
+
+        if not packages_to_download:
+            progress_message = ""
+        elif len(packages_to_download) == 1:
+            progress_message = "Downloading \"{:s}\"".format(packages_to_download[0][0].manifest.id)
+        else:
+            progress_message = "Downloading {:d} packages".format(len(packages_to_download))
+
+        request_exit = False
+        with concurrent.futures.ThreadPoolExecutor(max_workers=download_jobs) as executor:
+            futures_pending = {
+                executor.submit(
+                    subcmd_client._install_package_download_impl,
+                    filepath_remote_archive=filepath_remote_archive,
+                    filepath_local_cache_archive=os.path.join(local_cache_dir, manifest_archive.manifest.id + PKG_EXT),
+                    archive_size_expected=manifest_archive.archive_size,
+                    archive_hash_expected=manifest_archive.archive_hash,
+                    pkg_idname=manifest_archive.manifest.id,
+                    headers=headers,
+                    timeout_in_seconds=timeout_in_seconds,
+                    transfer_limits=transfer_limits,
+                    download_state=download_state,
+                    cancel_event=cancel_event,
+                ): manifest_archive
+                for (manifest_archive, filepath_remote_archive), download_state in zip(
+                    packages_to_download,
+                    download_states,
+                    strict=True,
+                )
+            }
+
+            try:
+                # Install from the cache while the downloads run.
+                for manifest_archive in packages_cached:
+                    install_fn(manifest_archive)
+
+                while True:
+                    if progress_message:
+                        request_exit |= msglog.progress(
+                            progress_message,
+                            sum(download_state.size_done for download_state in download_states),
+                            size_total,
+                            'BYTE',
+                        )
+                    if request_exit:
+                        return False
+                    if not futures_pending:
+                        break
+
+                    futures_done, _ = concurrent.futures.wait(
+                        futures_pending,
+                        timeout=DOWNLOAD_PROGRESS_INTERVAL,
+                        return_when=concurrent.futures.FIRST_COMPLETED,
+                    )
+                    for future in futures_done:
+                        manifest_archive = futures_pending.pop(future)
+                        if (error := future.result()) is not None:
+                            msglog.fatal_error(error)
+                            return False
+                        # Other downloads continue in the background while this package installs.
+                        install_fn(manifest_archive)
+            finally:
+                # Stop any downloads that are still running on failure (a no-op on success).
+                cancel_event.set()
+                executor.shutdown(wait=True, cancel_futures=True)
 
         return True
 
@@ -4213,7 +7063,17 @@ class subcmd_client:
             python_version: str,
             access_token: str,
             timeout_in_seconds: float,
+            transfer_limits: TransferLimits,
             temp_prefix_and_suffix: tuple[str, str],
+            download_jobs: int,
+            extract_jobs: int,
+            wheel_store: bool,
+            delta_upgrade: bool,
+            defer_removal: bool,
+            compile_bytecode: bool,
+            compile_jobs: int,
+            global_cache_dir: str,
+            global_cache_size: int,
     ) -> bool:
 
         # Validate arguments.
@@ -4246,6 +7106,23 @@ class subcmd_client:
         )) is None:
             return False
 
+        archive_cache_shared = ArchiveCacheShared(global_cache_dir, global_cache_size) if global_cache_dir else None
+
+        wheel_store_dir = ""
+        if wheel_store:
+            if (wheel_store_dir_or_none := repo_local_private_dir_ensure_with_subdir(
+                    local_dir=local_dir,
+                    subdir="wheels",
+                    error_fn=lambda ex: any_as_none(
+                        msglog.fatal_error("Error creating wheel store directory: {:s}".format(str(ex)))
+                    ),
+            )) is None:
+                return False
+            if (error := wheel_store_link_test_or_error(wheel_store_dir_or_none, local_dir)) is not None:
+                msglog.warn("Wheel store disabled, hard-links aren't supported ({:s})".format(error))
+            else:
+                wheel_store_dir = wheel_store_dir_or_none
+
         # Most likely this doesn't have duplicates,but any errors procured by duplicates
         # are likely to be obtuse enough that it's better to guarantee there are none.
         packages_as_set = set(packages)
@@ -4321,126 +7198,111 @@ class subcmd_client:
                     manifest_archive,
                 ))
                 has_fatal_error = True
-                continue
-
-            packages_info.append(manifest_archive)
-
-        if has_fatal_error:
-            return False
-        del has_fatal_error
-
-        request_exit = False
-
-        # Ensure all cache is cleared (when `local_cache` is disabled) no matter the cause of exiting.
-        files_to_clean: list[str] = []
-        with CleanupPathsContext(files=files_to_clean, directories=()):
-            for manifest_archive in packages_info:
-                pkg_idname = manifest_archive.manifest.id
-                # Archive name.
-                archive_size_expected = manifest_archive.archive_size
-                archive_hash_expected = manifest_archive.archive_hash
-                pkg_archive_url = manifest_archive.archive_url
-
-                # Local path.
-                filepath_local_cache_archive = os.path.join(local_cache_dir, pkg_idname + PKG_EXT)
-
-                if not local_cache:
-                    files_to_clean.append(filepath_local_cache_archive)
-
-                # Remote path.
-                if pkg_archive_url.startswith("./"):
-                    if remote_url_has_filename_suffix(remote_url_strip):
-                        filepath_remote_archive = remote_url_strip.rpartition("/")[0] + pkg_archive_url[1:]
-                    else:
-                        filepath_remote_archive = remote_url_strip.rstrip("/") + pkg_archive_url[1:]
-                else:
-                    filepath_remote_archive = pkg_archive_url
-
-                # Check if the cache should be used.
-                found = False
-                if os.path.exists(filepath_local_cache_archive):
-                    if local_cache:
-                        if isinstance((result := sha256_from_file_or_error(
-                                filepath_local_cache_archive,
-                                hash_prefix=True,
-                        )), str):
-                            # Only a warning because it's not a problem to re-download the file.
-                            msglog.warn("unable to calculate hash for cache: {:s}".format(result))
-                        elif result == (archive_size_expected, archive_hash_expected):
-                            found = True
-                    if not found:
-                        os.unlink(filepath_local_cache_archive)
-
-                if not found:
-                    # Create `filepath_local_cache_archive`.
-                    filename_archive_size_test = 0
-                    sha256 = hashlib.new('sha256')
+                continue
 
-                    # NOTE(@ideasman42): There is more logic in the try/except block than I'd like.
-                    # Refactoring could be done to avoid that but it ends up making logic difficult to follow.
-                    try:
-                        with open(filepath_local_cache_archive, "wb") as fh_cache:
-                            for block in url_retrieve_to_data_iter_or_filesystem(
-                                    filepath_remote_archive,
-                                    headers=url_request_headers_create(
-                                        accept_json=False,
-                                        user_agent=online_user_agent,
-                                        access_token=access_token,
-                                    ),
-                                    chunk_size=CHUNK_SIZE_DEFAULT,
-                                    timeout_in_seconds=timeout_in_seconds,
-                                    retrieve_info=DataRetrieveInfo(),  # Unused.
-                            ):
-                                request_exit |= msglog.progress(
-                                    "Downloading \"{:s}\"".format(pkg_idname),
-                                    filename_archive_size_test,
-                                    archive_size_expected,
-                                    'BYTE',
-                                )
-                                if request_exit:
-                                    break
-                                fh_cache.write(block)
-                                sha256.update(block)
-                                filename_archive_size_test += len(block)
-
-                    except (Exception, KeyboardInterrupt) as ex:
-                        # NOTE: don't support `demote_connection_errors_to_status` here because a connection
-                        # failure on installing *is* an error by definition.
-                        # Unlike querying information which might reasonably be skipped.
-                        msglog.fatal_error(
-                            url_retrieve_exception_as_message(
-                                ex, prefix="install", url=filepath_remote_archive))
-                        return False
+            packages_info.append(manifest_archive)
 
-                    if request_exit:
-                        return False
+        if has_fatal_error:
+            return False
+        del has_fatal_error
 
-                    # Validate:
-                    if filename_archive_size_test != archive_size_expected:
-                        msglog.fatal_error("Archive size mismatch \"{:s}\", expected {:d}, was {:d}".format(
-                            pkg_idname,
-                            archive_size_expected,
-                            filename_archive_size_test,
-                        ))
-                        return False
-                    filename_archive_hash_test = "sha256:" + sha256.hexdigest()
-                    if filename_archive_hash_test != archive_hash_expected:
-                        msglog.fatal_error("Archive checksum mismatch \"{:s}\", expected {:s}, was {:s}".format(
-                            pkg_idname,
-                            archive_hash_expected,
-                            filename_archive_hash_test,
-                        ))
-                        return False
-                    del filename_archive_size_test
-                    del filename_archive_hash_test
-                del found
-                del filepath_local_cache_archive
+        if compile_bytecode and (error := bytecode_compile_python_version_or_error(python_version_tuple)) is not None:
+            msglog.warn("Skipping bytecode compilation: {:s}".format(error))
+            compile_bytecode = False
 
-            # All packages have been downloaded, install them.
-            for manifest_archive in packages_info:
-                filepath_local_cache_archive = os.path.join(local_cache_dir, manifest_archive.manifest.id + PKG_EXT)
+        with (
+                RemovalReaper(defer=defer_removal) as reaper,
+                BytecodeCompiler(jobs=compile_jobs) as bytecode_compiler,
+        ):
+            # Ensure all cache is cleared (when `local_cache` is disabled) no matter the cause of exiting.
+            files_to_clean: list[str] = []
+            with CleanupPathsContext(files=files_to_clean, directories=()):
+                # Packages that need to be downloaded: `(manifest_archive, filepath_remote_archive)`.
+                packages_to_download: list[tuple[PkgManifest_Archive, str]] = []
+                # Packages with a valid archive in the cache.
+                packages_cached: list[PkgManifest_Archive] = []
+
+                for manifest_archive in packages_info:
+                    pkg_idname = manifest_archive.manifest.id
+                    # Archive name.
+                    archive_size_expected = manifest_archive.archive_size
+                    archive_hash_expected = manifest_archive.archive_hash
+                    pkg_archive_url = manifest_archive.archive_url
+
+                    # Local path.
+                    filepath_local_cache_archive = os.path.join(local_cache_dir, pkg_idname + PKG_EXT)
+
+                    if not local_cache:
+                        files_to_clean.append(filepath_local_cache_archive)
+                        files_to_clean.append(filepath_local_cache_archive + SHA256_SIDECAR_EXT)
+
+                    # Remote path.
+                    if pkg_archive_url.startswith("./"):
+                        if remote_url_has_filename_suffix(remote_url_strip):
+                            filepath_remote_archive = remote_url_strip.rpartition("/")[0] + pkg_archive_url[1:]
+                        else:
+                            filepath_remote_archive = remote_url_strip.rstrip("/") + pkg_archive_url[1:]
+                    else:
+                        filepath_remote_archive = pkg_archive_url
+
+                    # Check if the cache should be used.
+                    found = False
+                    if os.path.exists(filepath_local_cache_archive):
+                        if local_cache:
+                            if isinstance((result := sha256_from_file_with_sidecar_or_error(
+                                    filepath_local_cache_archive,
+                            )), str):
+                                # Only a warning because it's not a problem to re-download the file.
+                                msglog.warn("unable to calculate hash for cache: {:s}".format(result))
+                            elif result == (archive_size_expected, archive_hash_expected):
+                                found = True
+                        if not found:
+                            os.unlink(filepath_local_cache_archive)
+
+                    if (not found) and (archive_cache_shared is not None):
+                        if isinstance((result := archive_cache_shared.copy_to_filepath_or_error(
+                                archive_hash_expected,
+                                archive_size_expected,
+                                filepath_local_cache_archive,
+                        )), str):
+                            # Only a warning because it's not a problem to download the file.
+                            msglog.warn(result)
+                        else:
+                            found = result
+                            if found:
+                                # The hash was checked when linking the archive.
+                                sha256_sidecar_write(filepath_local_cache_archive, archive_hash_expected)
+
+                    if found:
+                        pkg_archive_partial_filepaths_remove(filepath_local_cache_archive)
+                        packages_cached.append(manifest_archive)
+                    else:
+                        # Partial downloads of other versions of this package can't be resumed.
+                        pkg_archive_partial_filepaths_remove(
+                            filepath_local_cache_archive,
+                            keep=pkg_archive_partial_filepath(
+                                filepath_local_cache_archive,
+                                archive_size_expected,
+                                archive_hash_expected,
+                            ),
+                        )
+                        packages_to_download.append((manifest_archive, filepath_remote_archive))
+                    del found
+                    del filepath_local_cache_archive
+
+                def install_fn(manifest_archive: PkgManifest_Archive) -> None:
+                    filepath_local_cache_archive = os.path.join(local_cache_dir, manifest_archive.manifest.id + PKG_EXT)
+                    if archive_cache_shared is not None:
+                        # Add downloaded archives, cached archives are marked as used.
+                        if (error := archive_cache_shared.add_from_filepath_or_error(
+                                manifest_archive.archive_hash,
+                                manifest_archive.archive_size,
+                                filepath_local_cache_archive,
+                        )) is not None:
+                            msglog.warn(error)
 
-                if not subcmd_client._install_package_from_file_impl(
+                    # A failure to install is reported, other packages are still installed.
+                    subcmd_client._install_package_from_file_impl(
                         msglog,
                         local_dir=local_dir,
                         filepath_archive=filepath_local_cache_archive,
@@ -4448,9 +7310,34 @@ class subcmd_client:
                         python_version_tuple=python_version_tuple,
                         manifest_compare=manifest_archive.manifest,
                         temp_prefix_and_suffix=temp_prefix_and_suffix,
+                        extract_jobs=extract_jobs,
+                        wheel_store_dir=wheel_store_dir,
+                        delta_upgrade=delta_upgrade,
+                        reaper=reaper,
+                        bytecode_compiler=bytecode_compiler if compile_bytecode else None,
+                    )
+
+                # Each package is installed as soon as its archive is available.
+                if not subcmd_client._install_packages_download(
+                        msglog,
+                        local_cache_dir=local_cache_dir,
+                        packages_to_download=packages_to_download,
+                        packages_cached=packages_cached,
+                        headers=url_request_headers_create(
+                            accept_json=False,
+                            user_agent=online_user_agent,
+                            access_token=access_token,
+                        ),
+                        timeout_in_seconds=timeout_in_seconds,
+                        transfer_limits=transfer_limits,
+                        download_jobs=download_jobs,
+                        install_fn=install_fn,
                 ):
-                    # The package failed to install.
-                    continue
+                    return False
+
+        if wheel_store_dir:
+            # Wheels from replaced packages may no longer be used.
+            wheel_store_remove_unused(wheel_store_dir)
 
         return True
 
@@ -4462,6 +7349,8 @@ class subcmd_client:
             user_dir: str,
             packages: Sequence[str],
             temp_prefix_and_suffix: tuple[str, str],
+            defer_removal: bool,
+            remove_jobs: int,
     ) -> bool:
         if not os.path.isdir(local_dir):
             msglog.fatal_error("Missing local \"{:s}\"".format(local_dir))
@@ -4507,41 +7396,242 @@ class subcmd_client:
         if has_fatal_error:
             return False
 
-        files_to_clean: list[str] = []
-        with CleanupPathsContext(files=files_to_clean, directories=()):
-            for pkg_idname in packages_valid:
-                filepath_local_pkg = os.path.join(local_dir, pkg_idname)
-
-                # First try and rename which will fail on WIN32 when one of the files is locked.
+        # Only check the wheel store when a removed package may have linked wheels from it.
+        has_wheels = False
+        for pkg_idname in packages_valid:
+            if (record := pkg_record_read_or_none(os.path.join(local_dir, pkg_idname))) is None:
+                has_wheels = True
+            elif any(path.lower().endswith(".whl") for path in record.keys()):
+                has_wheels = True
+            if has_wheels:
+                break
 
-                if (error := rmtree_with_fallback_or_error_pseudo_atomic(
-                        filepath_local_pkg,
+        def remove_fn(pkg_idname: str) -> tuple[str | None, bool, str | None]:
+            # Return the error removing the local directory, if there are user files & the error removing them.
+            # The user directory is only removed when the local directory was removed.
+
+            # First try and rename which will fail on WIN32 when one of the files is locked.
+            if (error := rmtree_with_fallback_or_error_pseudo_atomic(
+                    os.path.join(local_dir, pkg_idname),
+                    temp_prefix_and_suffix=temp_prefix_and_suffix,
+                    reaper=reaper,
+            )) is not None:
+                return error, False, None
+
+            if user_dir:
+                filepath_user_pkg = os.path.join(user_dir, pkg_idname)
+                if os.path.exists(filepath_user_pkg):
+                    return None, True, rmtree_with_fallback_or_error_pseudo_atomic(
+                        filepath_user_pkg,
                         temp_prefix_and_suffix=temp_prefix_and_suffix,
-                )) is not None:
-                    msglog.error("Failure to remove \"{:s}\" with error ({:s})".format(pkg_idname, error))
-                    continue
-
-                msglog.status("Removed \"{:s}\"".format(pkg_idname))
+                        reaper=reaper,
+                    )
+            return None, False, None
 
-                filepath_local_cache_archive = os.path.join(local_cache_dir, pkg_idname + PKG_EXT)
-                if os.path.exists(filepath_local_cache_archive):
-                    files_to_clean.append(filepath_local_cache_archive)
+        import concurrent.futures
 
-                if user_dir:
-                    filepath_user_pkg = os.path.join(user_dir, pkg_idname)
-                    if os.path.exists(filepath_user_pkg):
-                        if (error := rmtree_with_fallback_or_error_pseudo_atomic(
-                                filepath_user_pkg,
-                                temp_prefix_and_suffix=temp_prefix_and_suffix,
-                        )) is not None:
+        with (
+                RemovalReaper(defer=defer_removal, jobs=remove_jobs) as reaper,
+                concurrent.futures.ThreadPoolExecutor(max_workers=remove_jobs) as executor,
+        ):
+            # Packages are removed in parallel, results are reported in order.
+            futures = [executor.submit(remove_fn, pkg_idname) for pkg_idname in packages_valid]
+
+            files_to_clean: list[str] = []
+            with CleanupPathsContext(files=files_to_clean, directories=()):
+                for pkg_idname, future in zip(packages_valid, futures):
+                    filepath_local_pkg = os.path.join(local_dir, pkg_idname)
+
+                    error, has_user, error_user = future.result()
+                    if error is not None:
+                        msglog.error("Failure to remove \"{:s}\" with error ({:s})".format(pkg_idname, error))
+                        continue
+
+                    msglog.status("Removed \"{:s}\"".format(pkg_idname))
+
+                    # Left behind by an upgrade which didn't complete.
+                    files_to_clean.append(pkg_delta_journal_filepath(filepath_local_pkg))
+                    if os.path.isdir(backup_dir := pkg_delta_backup_dirpath(filepath_local_pkg)):
+                        rmtree_with_fallback_or_error(backup_dir)
+
+                    filepath_local_cache_archive = os.path.join(local_cache_dir, pkg_idname + PKG_EXT)
+                    if os.path.exists(filepath_local_cache_archive):
+                        files_to_clean.append(filepath_local_cache_archive)
+                    files_to_clean.append(filepath_local_cache_archive + SHA256_SIDECAR_EXT)
+                    pkg_archive_partial_filepaths_remove(filepath_local_cache_archive)
+
+                    if has_user:
+                        if error_user is not None:
                             msglog.error(
-                                "Failure to remove \"{:s}\" user files with error ({:s})".format(pkg_idname, error),
+                                "Failure to remove \"{:s}\" user files with error ({:s})".format(
+                                    pkg_idname,
+                                    error_user,
+                                ),
                             )
                         else:
                             msglog.status("Removed cache \"{:s}\"".format(pkg_idname))
 
+        # Wheels from removed packages may no longer be used.
+        if has_wheels:
+            wheel_store_remove_unused(os.path.join(repo_local_private_dir(local_dir=local_dir), "wheels"))
+
+        return True
+
+    @staticmethod
+    def gc(
+            msglog: MessageLogger,
+            *,
+            local_dir: str,
+            user_dir: str,
+            temp_prefix_and_suffix: tuple[str, str],
+            min_age: float,
+    ) -> bool:
+        if not os.path.isdir(local_dir):
+            msglog.fatal_error("Missing local \"{:s}\"".format(local_dir))
+            return False
+
+        temp_prefix, temp_suffix = temp_prefix_and_suffix
+        if not (temp_prefix or temp_suffix):
+            # Every directory would match.
+            msglog.fatal_error("A temporary prefix or suffix is required")
+            return False
+
+        # Matches names from `rmtree_with_fallback_or_error_pseudo_atomic`,
+        # the renamed directories are packages, so the name between the prefix & suffix must be a package ID.
+        temp_name_re = re.compile(re.escape(temp_prefix) + r"(\w+)" + re.escape(temp_suffix) + "[0-9]*")
+
+        time_now = time.time()
+        size_total = 0
+        removed_total = 0
+        for dirpath in (local_dir, user_dir):
+            if not (dirpath and os.path.isdir(dirpath)):
+                continue
+            for entry in os.scandir(dirpath):
+                # Never a temporary directory, although it may match (when there is no suffix for e.g.).
+                if entry.name == REPO_LOCAL_PRIVATE_DIR:
+                    continue
+                if (temp_name_match := temp_name_re.fullmatch(entry.name)) is None:
+                    continue
+                if pkg_idname_is_valid_or_error(temp_name_match.group(1)) is not None:
+                    continue
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+
+                # The rename updates the change time (on WIN32 this is the creation time).
+                st = entry.stat(follow_symlinks=False)
+                age = time_now - max(st.st_mtime, st.st_ctime)
+                if age < min_age:
+                    continue
+
+                size = 0
+                for root, _dirs, files in os.walk(entry.path):
+                    for filename in files:
+                        try:
+                            size += os.lstat(os.path.join(root, filename)).st_size
+                        except OSError:
+                            pass
+
+                if (error := rmtree_with_fallback_or_error(entry.path)) is not None:
+                    msglog.error("Failed to remove \"{:s}\": {:s}".format(entry.path, error))
+                    continue
+
+                msglog.status("Removed \"{:s}\" ({:s}, {:.0f} seconds old)".format(
+                    entry.path,
+                    size_as_fmt_string(size),
+                    age,
+                ))
+                size_total += size
+                removed_total += 1
+
+        # Wheels from removed directories may no longer be used.
+        if removed_total:
+            wheel_store_remove_unused(os.path.join(repo_local_private_dir(local_dir=local_dir), "wheels"))
+
+        msglog.status("Removed {:d} directories ({:s})".format(removed_total, size_as_fmt_string(size_total)))
         return True
 
+    @staticmethod
+    def verify_packages(
+            msglog: MessageLogger,
+            *,
+            local_dir: str,
+            packages: Sequence[str],
+            content: bool,
+            jobs: int,
+    ) -> bool:
+        if not os.path.isdir(local_dir):
+            msglog.fatal_error("Missing local \"{:s}\"".format(local_dir))
+            return False
+
+        if not packages:
+            packages = sorted(
+                filename for filename in os.listdir(local_dir)
+                if os.path.isfile(os.path.join(local_dir, filename, PKG_MANIFEST_FILENAME_TOML))
+            )
+
+        has_fatal_error = False
+        records: dict[str, dict[str, tuple[int, int, int]]] = {}
+        for pkg_idname in packages:
+            if (pkg_idname in {"", ".", ".."}) or ("\\" in pkg_idname or "/" in pkg_idname):
+                msglog.fatal_error("Package name invalid \"{:s}\"".format(pkg_idname))
+                has_fatal_error = True
+                continue
+
+            filepath_local_pkg = os.path.join(local_dir, pkg_idname)
+            if not os.path.isdir(filepath_local_pkg):
+                msglog.fatal_error("Package not found \"{:s}\"".format(pkg_idname))
+                has_fatal_error = True
+                continue
+
+            if (record := pkg_record_read_or_none(filepath_local_pkg)) is None:
+                # Installed by an older version or from an archive which couldn't be recorded.
+                msglog.warn("Package \"{:s}\" has no record of installed files, skipping".format(pkg_idname))
+                continue
+            records[pkg_idname] = record
+
+        if has_fatal_error:
+            return False
+
+        import concurrent.futures
+
+        is_modified = False
+        with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+            futures = {
+                executor.submit(
+                    pkg_record_verify,
+                    os.path.join(local_dir, pkg_idname),
+                    record,
+                    content=content,
+                ): pkg_idname
+                for pkg_idname, record in records.items()
+            }
+            for future in futures:
+                pkg_idname = futures[future]
+                try:
+                    paths_modified, paths_missing = future.result()
+                except Exception as ex:
+                    msglog.error("Failed to verify \"{:s}\": {:s}".format(pkg_idname, str(ex)))
+                    is_modified = True
+                    continue
+
+                if not (paths_modified or paths_missing):
+                    msglog.status("Verified \"{:s}\"".format(pkg_idname))
+                    continue
+
+                is_modified = True
+                if paths_modified:
+                    msglog.error("Package \"{:s}\" has modified files: {:s}".format(
+                        pkg_idname,
+                        ", ".join(paths_modified),
+                    ))
+                if paths_missing:
+                    msglog.error("Package \"{:s}\" has missing files: {:s}".format(
+                        pkg_idname,
+                        ", ".join(paths_missing),
+                    ))
+
+        return not is_modified
+
 
 class subcmd_author:
 
@@ -4553,6 +7643,9 @@ class subcmd_author:
             pkg_output_dir: str,
             pkg_output_filepath: str,
             split_platforms: bool,
+            incremental: bool,
+            reproducible: bool,
+            jobs: int,
             valid_tags_filepath: str,
             verbose: bool,
     ) -> bool:
@@ -4669,6 +7762,17 @@ class subcmd_author:
         if manifest_build.paths_exclude_pattern is not None:
             build_paths_exclude_pattern = PathPatternMatch(manifest_build.paths_exclude_pattern)
 
+        compress_policy = BuildCompressPolicy(manifest_build.compress)
+
+        # The time-stamp for all files (when reproducible).
+        date_time: tuple[int, int, int, int, int, int] | None = None
+        if reproducible:
+            if isinstance(result := build_reproducible_date_time_or_error(), str):
+                msglog.fatal_error(result)
+                return False
+            date_time = result
+            del result
+
         build_paths: list[tuple[str, str]] = []
 
         # Manifest & wheels.
@@ -4722,6 +7826,7 @@ class subcmd_author:
                         scandir_recursive(
                             pkg_source_dir,
                             filter_fn=scandir_filter_with_paths_exclude_pattern,
+                            jobs=jobs,
                         ),
                     )
                 else:
@@ -4735,7 +7840,7 @@ class subcmd_author:
                                 result = False
                         return result
 
-                    build_paths.extend(scandir_recursive(pkg_source_dir, filter_fn=scandir_filter_fallback))
+                    build_paths.extend(scandir_recursive(pkg_source_dir, filter_fn=scandir_filter_fallback, jobs=jobs))
 
                 del build_paths_extra_canonical
 
@@ -4757,14 +7862,28 @@ class subcmd_author:
                 return False
             del is_valid_python_package
 
+        import concurrent.futures
+
         request_exit = False
 
+        # The compression type & level of each file, shared between platforms.
+        compress_by_path: dict[str, tuple[int, int]] = {}
+        # When splitting platforms, the first archive written, its entries are copied into the other archives
+        # so files shared between platforms are only compressed once.
+        outfile_shared: str | None = None
+        # The hash of each file written to an incremental build, shared between platforms.
+        build_cache_hashes: dict[str, tuple[int, int, str]] = {}
+
         # A pass-through when there are no platforms to split.
         for build_paths_for_platform, platform in build_paths_filter_by_platform(
             build_paths,
             build_paths_wheel_range,
             tuple(manifest.platforms) if (split_platforms and manifest.platforms) else (),
         ):
+            if reproducible:
+                # Don't depend on the order files are found on the file-system.
+                build_paths_for_platform = sorted(build_paths_for_platform, key=lambda item: item[1])
+
             if pkg_output_filepath != "":
                 # The directory may be empty, that is fine as join handles this correctly.
                 pkg_dirpath, pkg_filename = os.path.split(pkg_output_filepath)
@@ -4804,16 +7923,96 @@ class subcmd_author:
             if request_exit:
                 return False
 
+            build_cache: BuildCacheIncremental | None = None
+            if incremental:
+                build_cache = BuildCacheIncremental(date_time=date_time, hashes=build_cache_hashes)
+                build_cache.load(outfile)
+
             with CleanupPathsContext(files=(outfile_temp,), directories=()):
+                zip_fh_shared: zipfile.ZipFile | None = None
                 try:
+                    if outfile_shared is not None:
+                        # pylint: disable-next=consider-using-with
+                        zip_fh_shared = zipfile.ZipFile(outfile_shared, 'r')
                     # pylint: disable-next=consider-using-with
                     zip_fh_context = zipfile.ZipFile(outfile_temp, 'w', zipfile.ZIP_DEFLATED, compresslevel=9)
                 except Exception as ex:
+                    if zip_fh_shared is not None:
+                        zip_fh_shared.close()
+                    if build_cache is not None:
+                        build_cache.close()
                     msglog.fatal_error("Error creating archive \"{:s}\"".format(str(ex)))
                     return False
 
-                with contextlib.closing(zip_fh_context) as zip_fh:
+                with (
+                        contextlib.closing(zip_fh_context) as zip_fh,
+                        contextlib.nullcontext() if build_cache is None else contextlib.closing(build_cache),
+                        contextlib.nullcontext() if zip_fh_shared is None else contextlib.closing(zip_fh_shared),
+                        concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor,
+                ):
+                    # Entries from the previous build which can be reused (when incremental).
+                    zinfo_prev_list: list[zipfile.ZipInfo | None] = [None] * len(build_paths_for_platform)
+                    # Entries from the archive of another platform which can be reused (when splitting platforms).
+                    zinfo_shared_list: list[zipfile.ZipInfo | None] = [None] * len(build_paths_for_platform)
+                    # The compression type & level of each file.
+                    compress_list: list[tuple[int, int]] = []
                     for filepath_abs, filepath_rel in build_paths_for_platform:
+                        if (compress := compress_by_path.get(filepath_rel)) is None:
+                            compress = compress_by_path[filepath_rel] = compress_policy.from_filepath(
+                                filepath_abs,
+                                filepath_rel,
+                            )
+                        compress_list.append(compress)
+                    # Files compressed by the `executor` & their sizes, these are written in order.
+                    deflate_indices: list[int] = []
+                    deflate_sizes: dict[int, int] = {}
+                    for i, (filepath_abs, filepath_rel) in enumerate(build_paths_for_platform):
+                        if platform and (filepath_rel == PKG_MANIFEST_FILENAME_TOML):
+                            continue
+                        compress_type, compresslevel = compress_list[i]
+                        if build_cache is not None:
+                            if (zinfo_prev := build_cache.find_previous(
+                                    filepath_abs,
+                                    filepath_rel,
+                                    compress_type,
+                                    compresslevel,
+                            )) is not None:
+                                zinfo_prev_list[i] = zinfo_prev
+                                continue
+                        if zip_fh_shared is not None:
+                            # Written by this build from the same file, using the same compression.
+                            if (zinfo_shared := zip_fh_shared.NameToInfo.get(filepath_rel)) is not None:
+                                zinfo_shared_list[i] = zinfo_shared
+                                continue
+                        if jobs > 1 and compress_type == zipfile.ZIP_DEFLATED:
+                            try:
+                                size = os.path.getsize(filepath_abs)
+                            except OSError:
+                                # Reported when the file is added to the archive.
+                                continue
+                            if size <= BUILD_DEFLATE_JOBS_SIZE_MAX:
+                                deflate_indices.append(i)
+                                deflate_sizes[i] = size
+
+                    # Limit the size of compressed files held in memory.
+                    deflate_futures: dict[int, concurrent.futures.Future[tuple[int, int, bytes]]] = {}
+                    deflate_indices_pending = deflate_indices[::-1]
+
+                    def deflate_submit() -> None:
+                        size_in_flight = sum(deflate_sizes[i] for i in deflate_futures)
+                        while deflate_indices_pending and (len(deflate_futures) < jobs * 2):
+                            i = deflate_indices_pending[-1]
+                            if size_in_flight + deflate_sizes[i] > BUILD_DEFLATE_JOBS_SIZE_MAX:
+                                break
+                            deflate_indices_pending.pop()
+                            size_in_flight += deflate_sizes[i]
+                            deflate_futures[i] = executor.submit(
+                                zipfile_deflate_from_filepath,
+                                build_paths_for_platform[i][0],
+                                compress_list[i][1],
+                            )
+
+                    for i, (filepath_abs, filepath_rel) in enumerate(build_paths_for_platform):
 
                         zip_data_override: bytes | None = None
                         if platform and (filepath_rel == PKG_MANIFEST_FILENAME_TOML):
@@ -4845,12 +8044,50 @@ class subcmd_author:
 
                         # Handy for testing that sub-directories:
                         # zip_fh.write(filepath_abs, manifest.id + "/" + filepath_rel)
-                        compress_type = zipfile.ZIP_STORED if filepath_skip_compress(filepath_abs) else None
+                        compress_type, compresslevel = compress_list[i]
                         try:
                             if zip_data_override is not None:
-                                zip_fh.writestr(filepath_rel, zip_data_override, compress_type=compress_type)
+                                zip_fh.writestr(
+                                    zipfile_info_from_file(filepath_abs, filepath_rel, date_time),
+                                    zip_data_override,
+                                    compress_type=compress_type,
+                                    compresslevel=compresslevel,
+                                )
+                            elif (zinfo_prev := zinfo_prev_list[i]) is not None:
+                                assert build_cache is not None
+                                build_cache.write_previous(zip_fh, zinfo_prev, filepath_abs, filepath_rel)
+                            elif (zinfo_shared := zinfo_shared_list[i]) is not None:
+                                assert zip_fh_shared is not None
+                                zipfile_write_raw_from_zipfile(
+                                    zip_fh,
+                                    zip_fh_shared,
+                                    zinfo_shared,
+                                    zipfile_info_from_file(filepath_abs, filepath_rel, date_time),
+                                )
+                                if build_cache is not None:
+                                    build_cache.add(filepath_abs, filepath_rel, compresslevel)
                             else:
-                                zip_fh.write(filepath_abs, filepath_rel, compress_type=compress_type)
+                                if deflate_indices:
+                                    deflate_submit()
+                                if (deflate_future := deflate_futures.pop(i, None)) is not None:
+                                    zipfile_write_deflated(
+                                        zip_fh,
+                                        filepath_abs,
+                                        filepath_rel,
+                                        deflate_future.result(),
+                                        date_time,
+                                    )
+                                else:
+                                    zipfile_write_from_filepath(
+                                        zip_fh,
+                                        filepath_abs,
+                                        filepath_rel,
+                                        compress_type=compress_type,
+                                        compresslevel=compresslevel,
+                                        date_time=date_time,
+                                    )
+                                if build_cache is not None:
+                                    build_cache.add(filepath_abs, filepath_rel, compresslevel)
                         except FileNotFoundError:
                             msglog.fatal_error("Error adding to archive, file not found: \"{:s}\"".format(filepath_rel))
                             return False
@@ -4861,6 +8098,12 @@ class subcmd_author:
                         if verbose:
                             msglog.status("add: {:s}".format(filepath_rel))
 
+                    if build_cache is not None:
+                        msglog.status("reused: {:d} of {:d} files".format(
+                            build_cache.reused,
+                            len(build_paths_for_platform),
+                        ))
+
                     request_exit |= msglog.status("complete")
                     if request_exit:
                         return False
@@ -4869,9 +8112,128 @@ class subcmd_author:
                     os.unlink(outfile)
                 os.rename(outfile_temp, outfile)
 
+                if platform and (outfile_shared is None):
+                    outfile_shared = outfile
+
+                if build_cache is not None:
+                    try:
+                        build_cache.write(outfile)
+                    except Exception as ex:
+                        msglog.warn("Error writing build cache \"{:s}\"".format(str(ex)))
+
         msglog.status("created: \"{:s}\", {:d}".format(outfile, os.path.getsize(outfile)))
         return True
 
+    @staticmethod
+    def build_batch(
+            msglog: MessageLogger,
+            *,
+            pkg_source_dirs: Sequence[str],
+            workspace_filepath: str,
+            pkg_output_dir: str,
+            pkg_output_filepath: str,
+            split_platforms: bool,
+            incremental: bool,
+            reproducible: bool,
+            jobs: int,
+            batch_jobs: int,
+            valid_tags_filepath: str,
+            verbose: bool,
+    ) -> bool:
+        """
+        Build multiple packages, each package is built in a separate process (when ``batch_jobs`` > 1).
+        """
+        if pkg_output_filepath != "":
+            msglog.fatal_error("An output filepath can't be used when building multiple packages")
+            return False
+
+        pkg_source_dirs = list(pkg_source_dirs)
+        if workspace_filepath:
+            if isinstance(result := build_workspace_source_dirs_or_error(workspace_filepath), str):
+                msglog.fatal_error("Error reading workspace \"{:s}\": {:s}".format(workspace_filepath, result))
+                return False
+            pkg_source_dirs.extend(result)
+            del result
+
+        # Building the same package more than once would write to the same output.
+        pkg_source_dirs_unique: dict[str, str] = {}
+        for pkg_source_dir in pkg_source_dirs:
+            pkg_source_dirs_unique.setdefault(os.path.normcase(os.path.realpath(pkg_source_dir)), pkg_source_dir)
+        pkg_source_dirs = list(pkg_source_dirs_unique.values())
+        del pkg_source_dirs_unique
+
+        if not pkg_source_dirs:
+            msglog.fatal_error("No package source directories to build")
+            return False
+
+        build_kwargs_list = [
+            {
+                "pkg_source_dir": pkg_source_dir,
+                "pkg_output_dir": pkg_output_dir,
+                "pkg_output_filepath": "",
+                "split_platforms": split_platforms,
+                "incremental": incremental,
+                "reproducible": reproducible,
+                "jobs": jobs,
+                "valid_tags_filepath": valid_tags_filepath,
+                "verbose": verbose,
+            }
+            for pkg_source_dir in pkg_source_dirs
+        ]
+
+        import concurrent.futures
+
+        results: Iterator[tuple[bool, list[tuple[str, PrimTypeOrSeq]]]]
+        executor: concurrent.futures.ProcessPoolExecutor | None = None
+        if batch_jobs > 1 and len(pkg_source_dirs) > 1:
+            executor = concurrent.futures.ProcessPoolExecutor(max_workers=min(batch_jobs, len(pkg_source_dirs)))
+            results = executor.map(subcmd_author._build_for_batch, build_kwargs_list)
+        else:
+            results = map(subcmd_author._build_for_batch, build_kwargs_list)
+
+        request_exit = False
+        failed = 0
+        try:
+            # Report the messages from each package in order, from the main thread.
+            for pkg_source_dir, (success, messages) in zip(pkg_source_dirs, results):
+                request_exit |= msglog.status("package: \"{:s}\"".format(pkg_source_dir))
+                for ty, msg in messages:
+                    if ty == "FATAL_ERROR":
+                        # Other packages are still built.
+                        assert isinstance(msg, str)
+                        request_exit |= msglog.error("\"{:s}\": {:s}".format(pkg_source_dir, msg))
+                    else:
+                        request_exit |= msglog.msg_fn(ty, msg)
+                if not success:
+                    failed += 1
+                if request_exit:
+                    return False
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+        if failed:
+            msglog.fatal_error("Failed to build {:d} of {:d} packages".format(failed, len(pkg_source_dirs)))
+            return False
+        msglog.status("built: {:d} packages".format(len(pkg_source_dirs)))
+        return True
+
+    @staticmethod
+    def _build_for_batch(build_kwargs: dict[str, Any]) -> tuple[bool, list[tuple[str, PrimTypeOrSeq]]]:
+        # Collect messages to be reported by the caller (which may be in another process).
+        messages: list[tuple[str, PrimTypeOrSeq]] = []
+
+        def msg_fn(ty: str, msg: PrimTypeOrSeq) -> bool:
+            messages.append((ty, msg))
+            return False
+
+        try:
+            success = subcmd_author.build(MessageLogger(msg_fn), **build_kwargs)
+        except Exception as ex:
+            messages.append(("FATAL_ERROR", "Error building package \"{:s}\"".format(str(ex))))
+            success = False
+        return success, messages
+
     @staticmethod
     def _validate_tags(
             msglog: MessageLogger,
@@ -5130,6 +8492,9 @@ def unregister():
                     pkg_output_dir=repo_dir,
                     pkg_output_filepath="",
                     split_platforms=False,
+                    incremental=False,
+                    reproducible=False,
+                    jobs=1,
                     valid_tags_filepath="",
                     verbose=False,
                 ):
@@ -5143,6 +8508,7 @@ def unregister():
             repo_config_filepath="",
             html=True,
             html_template="",
+            hash_cache=False,
         ):
             # Error running command.
             return False
@@ -5204,6 +8570,7 @@ def argparse_create_server_generate(
     generic_arg_server_generate_repo_config(subparse)
     generic_arg_server_generate_html(subparse)
     generic_arg_server_generate_html_template(subparse)
+    generic_arg_server_generate_hash_cache(subparse)
     if args_internal:
         generic_arg_output_type(subparse)
 
@@ -5214,6 +8581,7 @@ def argparse_create_server_generate(
             repo_config_filepath=args.repo_config,
             html=args.html,
             html_template=args.html_template,
+            hash_cache=args.hash_cache,
         ),
     )
 
@@ -5236,6 +8604,7 @@ def argparse_create_client_list(subparsers: "argparse._SubParsersAction[argparse
 
     generic_arg_output_type(subparse)
     generic_arg_timeout(subparse)
+    generic_arg_transfer_limits(subparse)
     generic_arg_demote_connection_failure_to_status(subparse)
 
     subparse.set_defaults(
@@ -5245,6 +8614,7 @@ def argparse_create_client_list(subparsers: "argparse._SubParsersAction[argparse
             online_user_agent=args.online_user_agent,
             access_token=args.access_token,
             timeout_in_seconds=args.timeout,
+            transfer_limits=transfer_limits_from_args(args),
             demote_connection_errors_to_status=args.demote_connection_errors_to_status,
         ),
     )
@@ -5269,6 +8639,7 @@ def argparse_create_client_sync(subparsers: "argparse._SubParsersAction[argparse
 
     generic_arg_output_type(subparse)
     generic_arg_timeout(subparse)
+    generic_arg_transfer_limits(subparse)
     generic_arg_ignore_broken_pipe(subparse)
     generic_arg_demote_connection_failure_to_status(subparse)
     generic_arg_extension_override(subparse)
@@ -5282,6 +8653,7 @@ def argparse_create_client_sync(subparsers: "argparse._SubParsersAction[argparse
             online_user_agent=args.online_user_agent,
             access_token=args.access_token,
             timeout_in_seconds=args.timeout,
+            transfer_limits=transfer_limits_from_args(args),
             demote_connection_errors_to_status=args.demote_connection_errors_to_status,
             force_exit_ok=args.force_exit_ok,
             extension_override=args.extension_override,
@@ -5301,6 +8673,11 @@ def argparse_create_client_install_files(subparsers: "argparse._SubParsersAction
     generic_arg_local_dir(subparse)
     generic_arg_blender_version(subparse)
     generic_arg_python_version(subparse)
+    generic_arg_extract_jobs(subparse)
+    generic_arg_wheel_store(subparse)
+    generic_arg_delta_upgrade(subparse)
+    generic_arg_defer_removal(subparse)
+    generic_arg_compile_bytecode(subparse)
 
     generic_arg_temp_prefix_and_suffix(subparse)
 
@@ -5314,6 +8691,12 @@ def argparse_create_client_install_files(subparsers: "argparse._SubParsersAction
             blender_version=args.blender_version,
             python_version=args.python_version,
             temp_prefix_and_suffix=args.temp_prefix_and_suffix,
+            extract_jobs=args.extract_jobs,
+            wheel_store=args.wheel_store,
+            delta_upgrade=args.delta_upgrade,
+            defer_removal=args.defer_removal,
+            compile_bytecode=args.compile_bytecode,
+            compile_jobs=args.compile_jobs,
         ),
     )
 
@@ -5334,11 +8717,19 @@ def argparse_create_client_install(subparsers: "argparse._SubParsersAction[argpa
     generic_arg_blender_version(subparse)
     generic_arg_python_version(subparse)
     generic_arg_access_token(subparse)
+    generic_arg_download_jobs(subparse)
+    generic_arg_extract_jobs(subparse)
+    generic_arg_wheel_store(subparse)
+    generic_arg_delta_upgrade(subparse)
+    generic_arg_defer_removal(subparse)
+    generic_arg_compile_bytecode(subparse)
+    generic_arg_global_cache(subparse)
 
     generic_arg_temp_prefix_and_suffix(subparse)
 
     generic_arg_output_type(subparse)
     generic_arg_timeout(subparse)
+    generic_arg_transfer_limits(subparse)
 
     subparse.set_defaults(
         func=lambda args: subcmd_client.install_packages(
@@ -5352,7 +8743,17 @@ def argparse_create_client_install(subparsers: "argparse._SubParsersAction[argpa
             python_version=args.python_version,
             access_token=args.access_token,
             timeout_in_seconds=args.timeout,
+            transfer_limits=transfer_limits_from_args(args),
             temp_prefix_and_suffix=args.temp_prefix_and_suffix,
+            download_jobs=args.download_jobs,
+            extract_jobs=args.extract_jobs,
+            wheel_store=args.wheel_store,
+            delta_upgrade=args.delta_upgrade,
+            defer_removal=args.defer_removal,
+            compile_bytecode=args.compile_bytecode,
+            compile_jobs=args.compile_jobs,
+            global_cache_dir=args.global_cache_dir,
+            global_cache_size=args.global_cache_size,
         ),
     )
 
@@ -5368,6 +8769,18 @@ def argparse_create_client_uninstall(subparsers: "argparse._SubParsersAction[arg
 
     generic_arg_local_dir(subparse)
     generic_arg_user_dir(subparse)
+    generic_arg_defer_removal(subparse)
+    subparse.add_argument(
+        "--remove-jobs",
+        dest="remove_jobs",
+        type=arg_handle_int_as_jobs,
+        help=(
+            "The maximum number of threads used to remove packages\n"
+            "(also used to remove the top-level directories of each package)."
+        ),
+        default=min(4, os.cpu_count() or 1),
+        required=False,
+    )
 
     generic_arg_temp_prefix_and_suffix(subparse)
 
@@ -5380,6 +8793,104 @@ def argparse_create_client_uninstall(subparsers: "argparse._SubParsersAction[arg
             user_dir=args.user_dir,
             packages=args.packages.split(","),
             temp_prefix_and_suffix=args.temp_prefix_and_suffix,
+            defer_removal=args.defer_removal,
+            remove_jobs=args.remove_jobs,
+        ),
+    )
+
+
+def argparse_create_client_gc(subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]") -> None:
+    subparse = subparsers.add_parser(
+        "gc",
+        help="Remove directories left from replacing or removing packages.",
+        description=(
+            "Remove directories which were renamed using \"--temp-prefix-and-suffix\" but not removed\n"
+            "(see \"--defer-removal\"), reporting their size & age."
+        ),
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+
+    generic_arg_local_dir(subparse)
+    generic_arg_user_dir(subparse)
+    subparse.add_argument(
+        "--min-age",
+        dest="min_age",
+        type=float,
+        help=(
+            "Only remove directories renamed at least this many seconds ago."
+        ),
+        default=0.0,
+        required=False,
+    )
+
+    generic_arg_temp_prefix_and_suffix(subparse)
+
+    generic_arg_output_type(subparse)
+
+    subparse.set_defaults(
+        func=lambda args: subcmd_client.gc(
+            msglog_from_args(args),
+            local_dir=args.local_dir,
+            user_dir=args.user_dir,
+            temp_prefix_and_suffix=args.temp_prefix_and_suffix,
+            min_age=args.min_age,
+        ),
+    )
+
+
+def argparse_create_client_verify(subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]") -> None:
+    subparse = subparsers.add_parser(
+        "verify",
+        help="Verify installed packages.",
+        description=(
+            "Check the files of installed packages against the record written on installation.\n"
+            "Files with a matching size & modification time are considered unchanged\n"
+            "unless \"--verify-content\" is enabled."
+        ),
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    subparse.add_argument(
+        dest="packages",
+        type=arg_handle_str_as_package_names,
+        nargs="?",
+        help=(
+            "The packages to verify (separated by ``,`` without spaces), all packages when omitted."
+        ),
+        default=(),
+    )
+
+    generic_arg_local_dir(subparse)
+
+    subparse.add_argument(
+        "--verify-content",
+        dest="verify_content",
+        type=arg_handle_int_as_bool,
+        help=(
+            "Check the contents of all files (slower)."
+        ),
+        default=False,
+        required=False,
+    )
+    subparse.add_argument(
+        "--verify-jobs",
+        dest="verify_jobs",
+        type=arg_handle_int_as_jobs,
+        help=(
+            "The maximum number of packages to verify at once."
+        ),
+        default=min(8, os.cpu_count() or 1),
+        required=False,
+    )
+
+    generic_arg_output_type(subparse)
+
+    subparse.set_defaults(
+        func=lambda args: subcmd_client.verify_packages(
+            msglog_from_args(args),
+            local_dir=args.local_dir,
+            packages=args.packages,
+            content=args.verify_content,
+            jobs=args.verify_jobs,
         ),
     )
 
@@ -5403,21 +8914,47 @@ def argparse_create_author_build(
     generic_arg_package_output_filepath(subparse)
     generic_arg_package_valid_tags(subparse)
     generic_arg_build_split_platforms(subparse)
+    generic_arg_build_incremental(subparse)
+    generic_arg_build_reproducible(subparse)
+    generic_arg_build_jobs(subparse)
+    generic_arg_build_batch(subparse)
     generic_arg_verbose(subparse)
 
     if args_internal:
         generic_arg_output_type(subparse)
 
-    subparse.set_defaults(
-        func=lambda args: subcmd_author.build(
+    def build_from_args(args: argparse.Namespace) -> bool:
+        if not (args.source_dirs or args.workspace_filepath):
+            return subcmd_author.build(
+                msglog_from_args(args),
+                pkg_source_dir="." if args.source_dir is None else args.source_dir,
+                pkg_output_dir=args.output_dir,
+                pkg_output_filepath=args.output_filepath,
+                split_platforms=args.split_platforms,
+                incremental=args.incremental,
+                reproducible=args.reproducible,
+                jobs=args.build_jobs,
+                valid_tags_filepath=args.valid_tags_filepath,
+                verbose=args.verbose,
+            )
+        return subcmd_author.build_batch(
             msglog_from_args(args),
-            pkg_source_dir=args.source_dir,
+            # Include the source directory when set.
+            pkg_source_dirs=([] if args.source_dir is None else [args.source_dir]) + args.source_dirs,
+            workspace_filepath=args.workspace_filepath,
             pkg_output_dir=args.output_dir,
             pkg_output_filepath=args.output_filepath,
             split_platforms=args.split_platforms,
+            incremental=args.incremental,
+            reproducible=args.reproducible,
+            jobs=args.build_jobs,
+            batch_jobs=args.batch_jobs,
             valid_tags_filepath=args.valid_tags_filepath,
             verbose=args.verbose,
-        ),
+        )
+
+    subparse.set_defaults(
+        func=build_from_args,
     )
 
 
@@ -5564,6 +9101,8 @@ def argparse_create(
         argparse_create_client_install_files(subparsers)
         argparse_create_client_install(subparsers)
         argparse_create_client_uninstall(subparsers)
+        argparse_create_client_verify(subparsers)
+        argparse_create_client_gc(subparsers)
 
         # Dummy commands.
         argparse_create_dummy_repo(subparsers)
@@ -5620,6 +9159,17 @@ def msg_print_json_0(ty: str, data: PrimTypeOrSeq) -> bool:
     return REQUEST_EXIT
 
 
+def transfer_limits_from_args(args: argparse.Namespace) -> TransferLimits:
+    stall_size, stall_in_seconds = args.timeout_stall
+    if args.timeout_deadline <= 0.0 and stall_in_seconds <= 0.0:
+        return TRANSFER_LIMITS_NONE
+    return TransferLimits(
+        deadline_in_seconds=args.timeout_deadline,
+        stall_size=stall_size,
+        stall_in_seconds=stall_in_seconds,
+    )
+
+
 def msglog_from_args(args: argparse.Namespace) -> MessageLogger:
     # Will be None when running form Blender.
     output_type = getattr(args, "output_type", 'TEXT')
@@ -5677,7 +9227,11 @@ def main(
         parser.print_help()
         return 0
 
-    result = args.func(args)
+    try:
+        result = args.func(args)
+    finally:
+        # Close idle keep-alive connections.
+        URL_CONNECTION_POOL.clear()
     assert isinstance(result, bool)
     return 0 if result else 1
 
@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# SPDX-FileCopyrightText: 2023 Blender Foundation
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+"""
+Check ``HTTPConnectionPool`` from ``blender_ext.py`` reuses connections.
+
+Local HTTP/1.1 (keep-alive) servers are started, archives are downloaded using ``url_retrieve_to_data_iter``
+and the number of connections each server accepted is compared with the number expected.
+Exits with an error when the numbers or the downloaded data differ.
+
+Usage: ``python check_http_connection_pool.py``
+"""
+
+import http.server
+import os
+import sys
+import threading
+import urllib.parse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from blender_ext import (  # noqa: E402
+    CHUNK_SIZE_DEFAULT,
+    DataRetrieveInfo,
+    TRANSFER_LIMITS_NONE,
+    URL_CONNECTION_POOL,
+    url_retrieve_to_data_iter,
+)
+
+
+def archive_data_from_size(size: int) -> bytes:
+    return (bytes(range(256)) * ((size // 256) + 1))[:size]
+
+
+class ArchiveServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), ArchiveRequestHandler)
+        self.connections = 0
+        self.connections_lock = threading.Lock()
+
+    def url(self, path: str) -> str:
+        return "http://127.0.0.1:{:d}{:s}".format(self.server_address[1], path)
+
+
+class ArchiveRequestHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Paths:
+    - ``/archive/{size}``: respond with ``size`` bytes, keeping the connection alive.
+    - ``/close/{size}``: respond with ``size`` bytes, then close the connection (``Connection: close``).
+    - ``/redirect?to={url}``: redirect to ``url``.
+    """
+    # Keep-alive connections.
+    protocol_version = "HTTP/1.1"
+    server: ArchiveServer
+
+    def setup(self) -> None:
+        # Called once for each connection.
+        with self.server.connections_lock:
+            self.server.connections += 1
+        super().setup()
+
+    def do_GET(self) -> None:
+        url_split = urllib.parse.urlsplit(self.path)
+        kind, _, size_str = url_split.path.strip("/").partition("/")
+        if kind == "redirect":
+            self.send_response(302)
+            self.send_header("Location", urllib.parse.parse_qs(url_split.query)["to"][0])
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if kind not in {"archive", "close"}:
+            self.send_error(404)
+            return
+
+        data = archive_data_from_size(int(size_str))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/zip")
+        self.send_header("Content-Length", str(len(data)))
+        if kind == "close":
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: object) -> None:  # pylint: disable=redefined-builtin
+        pass
+
+
+def download(url: str) -> bytes:
+    return b"".join(
+        # Blocks are only valid until the next iteration, so copy them.
+        bytes(block) for block in url_retrieve_to_data_iter(
+            url,
+            headers={},
+            chunk_size=CHUNK_SIZE_DEFAULT,
+            timeout_in_seconds=10.0,
+            transfer_limits=TRANSFER_LIMITS_NONE,
+            retrieve_info=DataRetrieveInfo(),
+        )
+    )
+
+
+def main() -> int:
+    # The pool isn't used when requests are sent through a proxy.
+    for key in list(os.environ.keys()):
+        if key.lower().endswith("_proxy"):
+            del os.environ[key]
+
+    server_a = ArchiveServer()
+    server_b = ArchiveServer()
+    for server in (server_a, server_b):
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    # Each test: `(name, [(url, size), ...], connections_expected_a, connections_expected_b)`.
+    tests: list[tuple[str, list[tuple[str, int]], int, int]] = [
+        (
+            "keep-alive", [
+                (server_a.url("/archive/{:d}".format(size)), size) for size in (0, 1, 1000, 300_000, 2_000_000)
+            ], 1, 0,
+        ),
+        (
+            "keep-alive (2 hosts)", [
+                (server.url("/archive/{:d}".format(size)), size)
+                for size in (10, 200_000, 3000) for server in (server_a, server_b)
+            ], 1, 1,
+        ),
+        (
+            "connection-close", [
+                (server_a.url("/close/{:d}".format(size)), size) for size in (10, 200_000, 3000)
+            ], 3, 0,
+        ),
+        (
+            "connection-close (mixed)", [
+                (server_a.url("/archive/10"), 10),
+                (server_a.url("/close/20"), 20),
+                (server_a.url("/archive/30"), 30),
+                (server_a.url("/archive/40"), 40),
+            ], 2, 0,
+        ),
+        (
+            "redirect", [
+                (server_a.url("/redirect?to=" + urllib.parse.quote("/archive/{:d}".format(size))), size)
+                for size in (10, 200_000, 3000)
+            ], 1, 0,
+        ),
+        (
+            "redirect (2 hosts)", [
+                (server_a.url("/redirect?to=" + urllib.parse.quote(server_b.url("/archive/{:d}".format(size)))), size)
+                for size in (10, 200_000, 3000)
+            ], 1, 1,
+        ),
+    ]
+
+    has_error = False
+    for name, requests, connections_expected_a, connections_expected_b in tests:
+        URL_CONNECTION_POOL.clear()
+        server_a.connections = server_b.connections = 0
+
+        for url, size in requests:
+            if download(url) != archive_data_from_size(size):
+                sys.stderr.write("Error: {:s}: unexpected data from {:s}\n".format(name, url))
+                has_error = True
+
+        connections = (server_a.connections, server_b.connections)
+        connections_expected = (connections_expected_a, connections_expected_b)
+        if connections != connections_expected:
+            sys.stderr.write("Error: {:s}: expected {!r} connections, found {!r}\n".format(
+                name, connections_expected, connections,
+            ))
+            has_error = True
+
+        print("{:24s} {:d} requests: {:d} connections".format(name, len(requests), sum(connections)))
+
+    URL_CONNECTION_POOL.clear()
+    for server in (server_a, server_b):
+        server.shutdown()
+        server.server_close()
+
+    return 1 if has_error else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())